@@ -1,9 +1,14 @@
 """Database setup and session management."""
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 
+from app.engine_profile import apply_profile, engine_options
+
 # Check for DATABASE_URL (Railway PostgreSQL) or fall back to SQLite
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
@@ -12,19 +17,34 @@ if DATABASE_URL:
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
     SQLALCHEMY_DATABASE_URL = DATABASE_URL
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
 else:
     # Local development: use SQLite
     DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "marathon.db")
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
+
+# Pragmas and pool settings come from app.engine_profile
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+apply_profile(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """The same database with its async driver, whatever driver ``url`` names (e.g. postgresql+psycopg2)."""
+    parsed = make_url(url)
+    driver = "sqlite+aiosqlite" if parsed.get_backend_name() == "sqlite" else "postgresql+asyncpg"
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# Async engine for read routes, so DB I/O doesn't hold a threadpool slot
+ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+apply_profile(async_engine.sync_engine)
+
+# Objects stay readable after commit; response serialization can't lazy-load under asyncio
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -35,7 +55,21 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency for getting async database sessions."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def dialect_insert(db: Session, model):
+    """INSERT construct for the session's backend, supporting ON CONFLICT clauses."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
 def init_db():
     """Initialize database tables."""
-    from app.models import training_plan, workout, run, note
+    from app.models import training_plan, workout, run, note, plan_stats, weather_cache, sync_cursor, change_log, training_load
+    from app.migrations import run_migrations
+    from app.services import plan_changes, change_feed  # noqa: F401  register write tracking
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
@@ -0,0 +1,95 @@
+"""Connection and pool settings for the SQLite and Postgres engines.
+
+Every setting can be overridden with the environment variable of the same name.
+"""
+from typing import Any, Dict
+import os
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# SQLite: WAL lets API reads proceed while the cron sync writes
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", "-65536"))  # negative = KiB
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Postgres pool (per process) and per-statement limit
+PG_POOL_SIZE = int(os.environ.get("PG_POOL_SIZE", "5"))
+PG_MAX_OVERFLOW = int(os.environ.get("PG_MAX_OVERFLOW", "10"))
+PG_POOL_TIMEOUT = int(os.environ.get("PG_POOL_TIMEOUT", "30"))  # seconds
+PG_POOL_RECYCLE = int(os.environ.get("PG_POOL_RECYCLE", "1800"))  # seconds
+PG_STATEMENT_TIMEOUT_MS = int(os.environ.get("PG_STATEMENT_TIMEOUT_MS", "30000"))
+
+SQLITE_PRAGMAS = {
+    "journal_mode": SQLITE_JOURNAL_MODE,
+    "synchronous": SQLITE_SYNCHRONOUS,
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "cache_size": SQLITE_CACHE_SIZE,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+}
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine for this database URL."""
+    if url.startswith("sqlite"):
+        connect_args: Dict[str, Any] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if not is_async:
+            connect_args["check_same_thread"] = False
+            return {"connect_args": connect_args}
+        # aiosqlite defaults to NullPool; keep connections so the page cache survives requests
+        return {"connect_args": connect_args, "poolclass": AsyncAdaptedQueuePool}
+
+    if is_async:
+        connect_args = {"server_settings": {"statement_timeout": str(PG_STATEMENT_TIMEOUT_MS)}}
+    else:
+        connect_args = {"options": f"-c statement_timeout={PG_STATEMENT_TIMEOUT_MS}"}
+    return {
+        "pool_size": PG_POOL_SIZE,
+        "max_overflow": PG_MAX_OVERFLOW,
+        "pool_timeout": PG_POOL_TIMEOUT,
+        "pool_recycle": PG_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": connect_args,
+    }
+
+
+def apply_profile(engine: Engine):
+    """Set the SQLite pragmas on every new connection (pass ``sync_engine`` for async engines)."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def describe_profile(conn: Connection) -> Dict[str, Any]:
+    """Settings in effect on a live connection, plus its engine's pool status.
+
+    For async engines call through ``AsyncConnection.run_sync``.
+    """
+    engine = conn.engine
+    profile: Dict[str, Any] = {
+        "dialect": engine.dialect.name,
+        "driver": engine.dialect.driver,
+        "pool": engine.pool.status(),
+    }
+    if engine.dialect.name == "sqlite":
+        profile["pragmas"] = {
+            name: conn.execute(text(f"PRAGMA {name}")).scalar() for name in SQLITE_PRAGMAS
+        }
+    else:
+        profile["statement_timeout"] = conn.execute(text("SHOW statement_timeout")).scalar()
+        profile["pool_settings"] = {
+            "pool_size": PG_POOL_SIZE,
+            "max_overflow": PG_MAX_OVERFLOW,
+            "pool_timeout": PG_POOL_TIMEOUT,
+            "pool_recycle": PG_POOL_RECYCLE,
+        }
+    return profile
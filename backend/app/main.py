@@ -12,6 +12,9 @@ from app.routers import (
     notes_router,
     sync_router,
     stats_router,
+    diagnostics_router,
+    changes_router,
+    dashboard_router,
 )
 
 # Initialize FastAPI app
@@ -41,6 +44,9 @@ app.include_router(runs_router)
 app.include_router(notes_router)
 app.include_router(sync_router)
 app.include_router(stats_router)
+app.include_router(diagnostics_router)
+app.include_router(changes_router)
+app.include_router(dashboard_router)
 
 
 @app.on_event("startup")
@@ -0,0 +1,167 @@
+"""Versioned schema migrations applied on startup.
+
+``create_all`` only creates missing tables, so changes to existing tables
+(new indexes, moved columns) are applied here. Each migration runs once per
+database in its own transaction and is recorded in ``schema_version``.
+Migrations must also be safe on a fresh database where ``create_all`` has
+already built the current schema.
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+import json
+
+from sqlalchemy import inspect, insert, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+# Postgres advisory lock serializing migrations across processes
+MIGRATION_LOCK_KEY = 2026041102
+
+
+def _move_inline_raw_data(conn: Connection):
+    """Move raw_data stored inline on actual_runs into run_raw_data."""
+    from app.models import RunRawData
+
+    if "raw_data" not in {c["name"] for c in inspect(conn).get_columns("actual_runs")}:
+        return
+
+    result = conn.execution_options(stream_results=True).execute(text(
+        "SELECT id, raw_data FROM actual_runs "
+        "WHERE raw_data IS NOT NULL AND id NOT IN (SELECT run_id FROM run_raw_data)"
+    ))
+    moved = 0
+    for rows in result.partitions(500):
+        conn.execute(insert(RunRawData), [
+            {"run_id": run_id, **RunRawData.pack(json.loads(raw) if isinstance(raw, str) else raw)}
+            for run_id, raw in rows
+        ])
+        moved += len(rows)
+    conn.execute(text("UPDATE actual_runs SET raw_data = NULL WHERE raw_data IS NOT NULL"))
+
+    if moved:
+        print(f"Moved raw data for {moved} runs to run_raw_data")
+
+
+def _add_query_indexes(conn: Connection):
+    """Index the columns the stats, workouts and runs endpoints filter and sort on.
+
+    actual_runs.planned_workout_id is unique and already indexed by its constraint.
+    """
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_planned_workouts_plan_date ON planned_workouts (plan_id, date)",
+        "CREATE INDEX IF NOT EXISTS ix_planned_workouts_plan_week ON planned_workouts (plan_id, week)",
+        "CREATE INDEX IF NOT EXISTS ix_actual_runs_started_at_id ON actual_runs (started_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_run_splits_run_split ON run_splits (run_id, split_number)",
+    ):
+        conn.execute(text(statement))
+
+
+def _add_plan_version(conn: Connection):
+    """Per-plan version counter backing ETags."""
+    if "version" in {c["name"] for c in inspect(conn).get_columns("training_plans")}:
+        return
+    conn.execute(text("ALTER TABLE training_plans ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+
+def _split_hr_zones(conn: Connection):
+    """Move the hr_zones JSON on actual_runs into one integer column per zone."""
+    columns = {c["name"] for c in inspect(conn).get_columns("actual_runs")}
+    for n in range(1, 6):
+        if f"hr_zone{n}_seconds" not in columns:
+            conn.execute(text(f"ALTER TABLE actual_runs ADD COLUMN hr_zone{n}_seconds INTEGER"))
+    if "hr_zones" not in columns:
+        return
+
+    rows = conn.execute(text("SELECT id, hr_zones FROM actual_runs WHERE hr_zones IS NOT NULL")).fetchall()
+    updates = []
+    for run_id, zones in rows:
+        zones = json.loads(zones) if isinstance(zones, str) else zones
+        if zones:
+            updates.append({"id": run_id, **{f"z{n}": zones.get(f"zone{n}") for n in range(1, 6)}})
+    if updates:
+        conn.execute(text(
+            "UPDATE actual_runs SET hr_zone1_seconds = :z1, hr_zone2_seconds = :z2, "
+            "hr_zone3_seconds = :z3, hr_zone4_seconds = :z4, hr_zone5_seconds = :z5 WHERE id = :id"
+        ), updates)
+    conn.execute(text("UPDATE actual_runs SET hr_zones = NULL WHERE hr_zones IS NOT NULL"))
+
+
+def _extend_plan_week_index(conn: Connection):
+    """Add date to the plan/week index so week listings are read in date order without a sort.
+
+    Otherwise the planner prefers the (plan_id, date) index for them and
+    scans the whole plan.
+    """
+    indexes = {ix["name"]: ix["column_names"] for ix in inspect(conn).get_indexes("planned_workouts")}
+    if indexes.get("ix_planned_workouts_plan_week") == ["plan_id", "week", "date"]:
+        return
+    conn.execute(text("DROP INDEX IF EXISTS ix_planned_workouts_plan_week"))
+    conn.execute(text("CREATE INDEX ix_planned_workouts_plan_week ON planned_workouts (plan_id, week, date)"))
+
+
+def _backfill_week_stats(conn: Connection):
+    """Build weekly rollups for plans that have workouts but none stored."""
+    from app.models import PlanWeekStats
+    from app.services.stats import compute_weekly_rollups
+
+    plan_ids = conn.execute(text(
+        "SELECT DISTINCT plan_id FROM planned_workouts "
+        "WHERE plan_id NOT IN (SELECT plan_id FROM plan_week_stats)"
+    )).scalars().all()
+    session = Session(bind=conn)
+    try:
+        for plan_id in plan_ids:
+            rows = [{"plan_id": plan_id, **values} for values in compute_weekly_rollups(session, plan_id)]
+            if rows:
+                conn.execute(insert(PlanWeekStats), rows)
+    finally:
+        session.close()
+    if plan_ids:
+        print(f"Built weekly stats for {len(plan_ids)} plans")
+
+
+# Append only: never reorder or edit a migration once it has shipped
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Move inline raw_data to run_raw_data", _move_inline_raw_data),
+    (2, "Add composite query indexes", _add_query_indexes),
+    (3, "Add training_plans.version", _add_plan_version),
+    (4, "Split actual_runs.hr_zones into per-zone columns", _split_hr_zones),
+    (5, "Add date to ix_planned_workouts_plan_week", _extend_plan_week_index),
+    (6, "Backfill plan_week_stats", _backfill_week_stats),
+]
+
+
+def current_version(conn: Connection) -> int:
+    """Highest migration version applied to the database."""
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+
+def run_migrations(engine: Engine) -> int:
+    """Apply pending migrations in order. Returns the number applied."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL)"
+        ))
+        applied = current_version(conn)
+
+    count = 0
+    for version, description, migrate in MIGRATIONS:
+        if version <= applied:
+            continue
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # Several app processes may start at the same time
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                if current_version(conn) >= version:
+                    continue
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": version, "d": description, "t": datetime.utcnow()},
+            )
+        print(f"Applied migration {version}: {description}")
+        count += 1
+    return count
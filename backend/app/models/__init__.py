@@ -1,7 +1,12 @@
 from app.models.training_plan import TrainingPlan
 from app.models.workout import PlannedWorkout
-from app.models.run import ActualRun, RunSplit, RunWeather
+from app.models.run import ActualRun, RunSplit, RunWeather, RunRawData, RunStream, RunStreamChunk
 from app.models.note import RunNote
+from app.models.plan_stats import PlanWeekStats
+from app.models.weather_cache import WeatherCache
+from app.models.sync_cursor import SyncCursor
+from app.models.change_log import ChangeLog
+from app.models.training_load import TrainingLoadDay
 
 __all__ = [
     "TrainingPlan",
@@ -9,5 +14,13 @@ __all__ = [
     "ActualRun",
     "RunSplit",
     "RunWeather",
+    "RunRawData",
+    "RunStream",
+    "RunStreamChunk",
     "RunNote",
+    "PlanWeekStats",
+    "WeatherCache",
+    "SyncCursor",
+    "ChangeLog",
+    "TrainingLoadDay",
 ]
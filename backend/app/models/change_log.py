@@ -0,0 +1,17 @@
+"""Append-only log of row changes backing the /api/changes feed."""
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    # Never reuse a seq after pruning, or clients holding a cursor would miss changes
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # Global, monotonically increasing change sequence; clients poll with it as their cursor
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)  # plans, workouts, runs, notes, splits, weather
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # upsert, delete
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
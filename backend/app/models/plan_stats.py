@@ -0,0 +1,26 @@
+"""Materialized per-plan weekly stats."""
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class PlanWeekStats(Base):
+    __tablename__ = "plan_week_stats"
+    __table_args__ = (UniqueConstraint("plan_id", "week"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("training_plans.id"), nullable=False)
+    week = Column(Integer, nullable=False)
+
+    # Rollups of the week's planned workouts and their linked runs
+    total_workouts = Column(Integer, default=0)
+    run_workouts = Column(Integer, default=0)  # excludes Rest and Mobility
+    completed_runs = Column(Integer, default=0)
+    planned_miles = Column(Float, default=0)
+    actual_miles = Column(Float, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    plan = relationship("TrainingPlan", back_populates="week_stats")
@@ -1,11 +1,18 @@
 """Actual run and related models."""
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, LargeBinary, Index
 from sqlalchemy.orm import relationship
+from typing import Optional, Dict, Any
+import json
+import zlib
 from app.database import Base
 
+# Number of Garmin heart rate zones, stored as hr_zone1_seconds .. hr_zone5_seconds
+HR_ZONE_COUNT = 5
+
 
 class ActualRun(Base):
     __tablename__ = "actual_runs"
+    __table_args__ = (Index("ix_actual_runs_started_at_id", "started_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     planned_workout_id = Column(Integer, ForeignKey("planned_workouts.id"), unique=True)
@@ -20,7 +27,12 @@ class ActualRun(Base):
     # Heart rate
     avg_hr = Column(Integer)
     max_hr = Column(Integer)
-    hr_zones = Column(JSON)  # {"zone1": 120, "zone2": 300, ...} seconds in each zone
+    # Seconds in each HR zone; exposed as the hr_zones dict
+    hr_zone1_seconds = Column(Integer)
+    hr_zone2_seconds = Column(Integer)
+    hr_zone3_seconds = Column(Integer)
+    hr_zone4_seconds = Column(Integer)
+    hr_zone5_seconds = Column(Integer)
 
     # Additional metrics
     elevation_gain = Column(Float)  # feet
@@ -37,17 +49,91 @@ class ActualRun(Base):
     # Timestamps
     started_at = Column(DateTime)
 
-    # Raw Garmin data for future use
-    raw_data = Column(JSON)
-
     # Relationships
     planned_workout = relationship("PlannedWorkout", back_populates="actual_run")
     splits = relationship("RunSplit", back_populates="run", cascade="all, delete-orphan")
     weather = relationship("RunWeather", back_populates="run", uselist=False, cascade="all, delete-orphan")
+    raw = relationship("RunRawData", uselist=False, cascade="all, delete-orphan")
+    stream = relationship("RunStream", uselist=False, cascade="all, delete-orphan")
+
+    @property
+    def hr_zones(self) -> Optional[Dict[str, int]]:
+        """{"zone1": 120, "zone2": 300, ...} seconds in each zone, or None if unknown."""
+        seconds = [getattr(self, f"hr_zone{n}_seconds") for n in range(1, HR_ZONE_COUNT + 1)]
+        if all(s is None for s in seconds):
+            return None
+        return {f"zone{n}": s or 0 for n, s in enumerate(seconds, start=1)}
+
+    @hr_zones.setter
+    def hr_zones(self, value: Optional[Dict[str, int]]):
+        for n in range(1, HR_ZONE_COUNT + 1):
+            setattr(self, f"hr_zone{n}_seconds", value.get(f"zone{n}") if value else None)
+
+    # Raw Garmin data for future use, stored compressed in run_raw_data and
+    # only loaded when accessed
+    @property
+    def raw_data(self) -> Optional[Dict[str, Any]]:
+        return self.raw.unpack() if self.raw else None
+
+    @raw_data.setter
+    def raw_data(self, value: Optional[Dict[str, Any]]):
+        self.raw = RunRawData(**RunRawData.pack(value)) if value is not None else None
+
+
+class RunRawData(Base):
+    __tablename__ = "run_raw_data"
+
+    run_id = Column(Integer, ForeignKey("actual_runs.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False, default="zlib")
+    payload = Column(LargeBinary, nullable=False)  # compressed JSON
+
+    @staticmethod
+    def pack(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Column values storing ``data`` compressed."""
+        return {
+            "codec": "zlib",
+            "payload": zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8")),
+        }
+
+    def unpack(self) -> Dict[str, Any]:
+        """Decompress the stored payload."""
+        if self.codec != "zlib":
+            raise ValueError(f"Unknown raw data codec: {self.codec}")
+        return json.loads(zlib.decompress(self.payload).decode("utf-8"))
+
+
+class RunStream(Base):
+    """Per-second samples of a run; see app.services.streams for the encoding."""
+    __tablename__ = "run_streams"
+
+    run_id = Column(Integer, ForeignKey("actual_runs.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False)
+    channels = Column(String, nullable=False)  # comma-separated, e.g. "t,hr,pace,lat,lon"
+    sample_count = Column(Integer, nullable=False)
+    duration_seconds = Column(Integer, nullable=False)  # offset of the last sample
+
+    # Bucket-averaged copy of the whole run, for overview charts
+    preview_count = Column(Integer, nullable=False)
+    preview = Column(LargeBinary, nullable=False)
+
+    chunks = relationship("RunStreamChunk", cascade="all, delete-orphan", order_by="RunStreamChunk.chunk_index")
+
+
+class RunStreamChunk(Base):
+    """A fixed span of a run's stream, compressed on its own so ranges decode independently."""
+    __tablename__ = "run_stream_chunks"
+
+    run_id = Column(Integer, ForeignKey("run_streams.run_id", ondelete="CASCADE"), primary_key=True)
+    chunk_index = Column(Integer, primary_key=True)
+    start_offset = Column(Integer, nullable=False)  # seconds from the start of the run
+    end_offset = Column(Integer, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
 
 
 class RunSplit(Base):
     __tablename__ = "run_splits"
+    __table_args__ = (Index("ix_run_splits_run_split", "run_id", "split_number"),)
 
     id = Column(Integer, primary_key=True, index=True)
     run_id = Column(Integer, ForeignKey("actual_runs.id"), nullable=False)
@@ -0,0 +1,18 @@
+"""Per-plan sync high-water marks."""
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class SyncCursor(Base):
+    __tablename__ = "sync_cursors"
+    __table_args__ = (UniqueConstraint("plan_id", "data_type"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("training_plans.id", ondelete="CASCADE"), nullable=False)
+    data_type = Column(String, nullable=False)  # activities, sleep, hrv, weather
+
+    # Last date fully synced for this data type
+    synced_through = Column(Date, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,17 @@
+"""Materialized daily training load (fitness, fatigue and form)."""
+from sqlalchemy import Column, Float, Date, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class TrainingLoadDay(Base):
+    __tablename__ = "training_load_days"
+
+    day = Column(Date, primary_key=True)
+
+    load = Column(Float, nullable=False, default=0)  # TRIMP of the day's runs
+    atl = Column(Float, nullable=False)  # acute load (fatigue)
+    ctl = Column(Float, nullable=False)  # chronic load (fitness)
+    tsb = Column(Float, nullable=False)  # form: yesterday's CTL - ATL
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -15,5 +15,9 @@ class TrainingPlan(Base):
     target_pace = Column(String)  # e.g., "9:09/mile"
     units = Column(String, default="miles")
 
+    # Bumped by any write to the plan or its workouts, runs and notes; used for ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     # Relationships
     workouts = relationship("PlannedWorkout", back_populates="plan", cascade="all, delete-orphan")
+    week_stats = relationship("PlanWeekStats", back_populates="plan", cascade="all, delete-orphan")
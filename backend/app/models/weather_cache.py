@@ -0,0 +1,21 @@
+"""Cached Open-Meteo archive responses."""
+from sqlalchemy import Column, Integer, Date, DateTime, JSON, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class WeatherCache(Base):
+    __tablename__ = "weather_cache"
+    __table_args__ = (UniqueConstraint("lat_cell", "lon_cell", "date"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Grid cell: coordinates scaled by 10^precision and rounded
+    lat_cell = Column(Integer, nullable=False)
+    lon_cell = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)  # local date at the location
+
+    hourly = Column(JSON)  # {"time": [...24], "temperature_2m": [...24], ...}
+
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,11 +1,15 @@
 """Planned workout model."""
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class PlannedWorkout(Base):
     __tablename__ = "planned_workouts"
+    __table_args__ = (
+        Index("ix_planned_workouts_plan_date", "plan_id", "date"),
+        Index("ix_planned_workouts_plan_week", "plan_id", "week", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     plan_id = Column(Integer, ForeignKey("training_plans.id"), nullable=False)
@@ -4,6 +4,9 @@ from app.routers.runs import router as runs_router
 from app.routers.notes import router as notes_router
 from app.routers.sync import router as sync_router
 from app.routers.stats import router as stats_router
+from app.routers.diagnostics import router as diagnostics_router
+from app.routers.changes import router as changes_router
+from app.routers.dashboard import router as dashboard_router
 
 __all__ = [
     "plans_router",
@@ -12,4 +15,7 @@ __all__ = [
     "notes_router",
     "sync_router",
     "stats_router",
+    "diagnostics_router",
+    "changes_router",
+    "dashboard_router",
 ]
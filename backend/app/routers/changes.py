@@ -0,0 +1,29 @@
+"""Incremental change feed API routes."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database import get_async_db
+from app.services.change_feed import CursorExpired, changes_since, current_cursor
+
+router = APIRouter(prefix="/api/changes", tags=["Changes"])
+
+
+@router.get("/")
+async def list_changes(
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=2000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Rows inserted, updated or deleted after the ``since`` cursor.
+
+    Without ``since``, returns only the current cursor: load the full lists,
+    then poll with it. Deleted rows come back as tombstones (``op: delete``).
+    Responds 410 if the cursor is older than the retained change log.
+    """
+    if since is None:
+        return {"cursor": await current_cursor(db), "has_more": False, "changes": []}
+    try:
+        return await changes_since(db, since, limit)
+    except CursorExpired:
+        raise HTTPException(status_code=410, detail="Cursor expired, reload all data")
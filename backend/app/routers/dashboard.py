@@ -0,0 +1,56 @@
+"""Dashboard API routes."""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+
+from app.database import get_async_db
+from app.models import TrainingPlan, PlannedWorkout
+from app.routers.workouts import WORKOUT_DETAILS
+from app.schemas import WorkoutWithDetails
+from app.services.stats import (
+    get_week_stats,
+    plan_summary,
+    weekly_breakdown,
+    race_countdown,
+    hr_zone_totals,
+)
+from app.services.response_cache import response_cache, plan_tag, plan_etag
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@router.get("/")
+async def get_dashboard(request: Request, plan_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
+    """Summary, weekly mileage, countdown, HR zones and today's workout in one response.
+
+    Cached and ETagged as one unit per plan version and day.
+    """
+    plan = await db.get(TrainingPlan, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Training plan not found")
+    today = date.today()
+
+    async def build():
+        weeks, hr_zones = await db.run_sync(
+            lambda session: (get_week_stats(session, plan_id), hr_zone_totals(session, plan_id))
+        )
+        result = await db.execute(
+            select(PlannedWorkout)
+            .options(*WORKOUT_DETAILS)
+            .filter(PlannedWorkout.plan_id == plan_id)
+            .filter(PlannedWorkout.date == today)
+        )
+        todays_workout = result.scalars().first()
+
+        return {
+            "plan_id": plan_id,
+            "summary": plan_summary(plan, weeks),
+            "weekly": weekly_breakdown(weeks),
+            "countdown": race_countdown(plan),
+            "hr_zones": hr_zones,
+            "today": WorkoutWithDetails.model_validate(todays_workout) if todays_workout else None,
+        }
+
+    etag = plan_etag(plan_id, plan.version, today)
+    return await response_cache.respond(request, [plan_tag(plan_id)], build, etag=etag)
@@ -0,0 +1,26 @@
+"""Runtime diagnostics API routes."""
+from fastapi import APIRouter
+
+from app.database import engine, async_engine
+from app.engine_profile import describe_profile
+from app.services.response_cache import response_cache
+
+router = APIRouter(prefix="/api/diagnostics", tags=["Diagnostics"])
+
+
+@router.get("/database")
+async def database_profile():
+    """Connection settings and pool status for the sync and async engines."""
+    async with async_engine.connect() as conn:
+        async_profile = await conn.run_sync(describe_profile)
+
+    with engine.connect() as conn:
+        sync_profile = describe_profile(conn)
+
+    return {"sync": sync_profile, "async": async_profile}
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Response cache size and hit/miss counters."""
+    return response_cache.stats()
@@ -1,9 +1,11 @@
 """Run notes API routes."""
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import RunNote, PlannedWorkout
 from app.schemas import RunNoteCreate, RunNoteUpdate, RunNoteResponse
 
@@ -11,9 +13,10 @@ router = APIRouter(prefix="/api/notes", tags=["Notes"])
 
 
 @router.get("/", response_model=List[RunNoteResponse])
-def list_notes(db: Session = Depends(get_db)):
+async def list_notes(db: AsyncSession = Depends(get_async_db)):
     """List all notes."""
-    return db.query(RunNote).order_by(RunNote.created_at.desc()).all()
+    result = await db.execute(select(RunNote).order_by(RunNote.created_at.desc()))
+    return result.scalars().all()
 
 
 @router.post("/", response_model=RunNoteResponse)
@@ -37,18 +40,19 @@ def create_note(note: RunNoteCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{note_id}", response_model=RunNoteResponse)
-def get_note(note_id: int, db: Session = Depends(get_db)):
+async def get_note(note_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a note."""
-    note = db.query(RunNote).filter(RunNote.id == note_id).first()
+    note = await db.get(RunNote, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
 
 @router.get("/workout/{workout_id}", response_model=RunNoteResponse)
-def get_note_by_workout(workout_id: int, db: Session = Depends(get_db)):
+async def get_note_by_workout(workout_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get note for a specific workout."""
-    note = db.query(RunNote).filter(RunNote.planned_workout_id == workout_id).first()
+    result = await db.execute(select(RunNote).filter(RunNote.planned_workout_id == workout_id))
+    note = result.scalars().first()
     if not note:
         raise HTTPException(status_code=404, detail="Note not found for this workout")
     return note
@@ -1,10 +1,14 @@
 """Training plan API routes."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List
 
-from app.database import get_db
-from app.models import TrainingPlan, PlannedWorkout
+from app.database import get_db, get_async_db
+from app.models import TrainingPlan, PlannedWorkout, ActualRun
+from app.services.plan_changes import get_plan_version
+from app.services.response_cache import response_cache, plan_tag, plan_etag
 from app.schemas import (
     TrainingPlanCreate,
     TrainingPlanUpdate,
@@ -16,9 +20,10 @@ router = APIRouter(prefix="/api/plans", tags=["Training Plans"])
 
 
 @router.get("/", response_model=List[TrainingPlanResponse])
-def list_plans(db: Session = Depends(get_db)):
+async def list_plans(db: AsyncSession = Depends(get_async_db)):
     """List all training plans."""
-    return db.query(TrainingPlan).all()
+    result = await db.execute(select(TrainingPlan))
+    return result.scalars().all()
 
 
 @router.post("/", response_model=TrainingPlanResponse)
@@ -32,22 +37,35 @@ def create_plan(plan: TrainingPlanCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{plan_id}", response_model=TrainingPlanWithWorkouts)
-def get_plan(plan_id: int, db: Session = Depends(get_db)):
-    """Get a training plan with all workouts."""
-    plan = (
-        db.query(TrainingPlan)
-        .options(
-            joinedload(TrainingPlan.workouts)
-            .joinedload(PlannedWorkout.actual_run),
-            joinedload(TrainingPlan.workouts)
-            .joinedload(PlannedWorkout.note),
-        )
-        .filter(TrainingPlan.id == plan_id)
-        .first()
-    )
-    if not plan:
+async def get_plan(request: Request, plan_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a training plan with all workouts.
+
+    Sends an ETag from the plan's version; If-None-Match gets a 304.
+    """
+    version = await get_plan_version(db, plan_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Training plan not found")
-    return plan
+
+    async def build():
+        result = await db.execute(
+            select(TrainingPlan)
+            .options(
+                selectinload(TrainingPlan.workouts).options(
+                    joinedload(PlannedWorkout.actual_run).options(
+                        selectinload(ActualRun.splits),
+                        joinedload(ActualRun.weather),
+                    ),
+                    joinedload(PlannedWorkout.note),
+                ),
+            )
+            .filter(TrainingPlan.id == plan_id)
+        )
+        plan = result.scalars().first()
+        if not plan:
+            raise HTTPException(status_code=404, detail="Training plan not found")
+        return TrainingPlanWithWorkouts.model_validate(plan)
+
+    return await response_cache.respond(request, [plan_tag(plan_id)], build, etag=plan_etag(plan_id, version))
 
 
 @router.patch("/{plan_id}", response_model=TrainingPlanResponse)
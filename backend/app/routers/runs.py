@@ -1,15 +1,26 @@
 """Actual run API routes."""
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from datetime import date
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
+import base64
 
-from app.database import get_db
-from app.models import ActualRun, RunSplit, RunWeather
+from app.database import get_db, get_async_db
+from app.models import ActualRun, PlannedWorkout, RunSplit, RunWeather, RunRawData
+from app.services.change_feed import record_changes
+from app.services.plan_changes import mark_plans_changed
+from app.services.stats import refresh_stats_for_workouts
+from app.services.streams import InvalidStream, read_stream, store_streams
+from app.services.training_load import refresh_training_load
 from app.schemas import (
     ActualRunCreate,
     ActualRunResponse,
     RunWithDetails,
+    RunPage,
+    RunStreamUpload,
+    RunSplitBase,
     RunSplitCreate,
     RunSplitResponse,
     RunWeatherCreate,
@@ -19,25 +30,78 @@ from app.schemas import (
 router = APIRouter(prefix="/api/runs", tags=["Runs"])
 
 
-@router.get("/", response_model=List[RunWithDetails])
-def list_runs(
+@router.get("/", response_model=RunPage)
+async def list_runs(
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    min_distance: Optional[float] = Query(None, ge=0),
+    max_distance: Optional[float] = Query(None, ge=0),
+    workout_type: Optional[str] = Query(None),
+    matched: Optional[bool] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """List recent runs."""
-    runs = (
-        db.query(ActualRun)
+    """List runs newest first, paginated by a (started_at, id) cursor."""
+    query = (
+        select(ActualRun)
         .options(
-            joinedload(ActualRun.splits),
+            selectinload(ActualRun.splits),
             joinedload(ActualRun.weather),
         )
-        .order_by(ActualRun.started_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
     )
-    return runs
+
+    if start_date:
+        query = query.filter(ActualRun.started_at >= datetime.combine(start_date, time.min))
+    if end_date:
+        query = query.filter(ActualRun.started_at < datetime.combine(end_date + timedelta(days=1), time.min))
+    if min_distance is not None:
+        query = query.filter(ActualRun.distance >= min_distance)
+    if max_distance is not None:
+        query = query.filter(ActualRun.distance <= max_distance)
+    if workout_type:
+        query = query.join(ActualRun.planned_workout).filter(PlannedWorkout.workout_type == workout_type)
+    if matched is not None:
+        query = query.filter(
+            ActualRun.planned_workout_id.isnot(None) if matched else ActualRun.planned_workout_id.is_(None)
+        )
+
+    if cursor:
+        started_at, run_id = _decode_cursor(cursor)
+        if started_at is None:
+            # Already into the runs without a start time, which sort last
+            query = query.filter(ActualRun.started_at.is_(None), ActualRun.id < run_id)
+        else:
+            query = query.filter(or_(
+                ActualRun.started_at < started_at,
+                and_(ActualRun.started_at == started_at, ActualRun.id < run_id),
+                ActualRun.started_at.is_(None),
+            ))
+
+    result = await db.execute(
+        query
+        .order_by(ActualRun.started_at.desc().nulls_last(), ActualRun.id.desc())
+        .limit(limit + 1)
+    )
+    runs = result.scalars().all()
+
+    next_cursor = _encode_cursor(runs[limit - 1]) if len(runs) > limit else None
+    return {"runs": runs[:limit], "next_cursor": next_cursor}
+
+
+def _encode_cursor(run: ActualRun) -> str:
+    """Opaque cursor pointing just after the given run."""
+    started_at = run.started_at.isoformat() if run.started_at else ""
+    return base64.urlsafe_b64encode(f"{started_at}|{run.id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Parse a cursor produced by _encode_cursor."""
+    try:
+        started_at, run_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(started_at) if started_at else None), int(run_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.post("/", response_model=ActualRunResponse)
@@ -45,28 +109,65 @@ def create_run(run: ActualRunCreate, db: Session = Depends(get_db)):
     """Create a new run record."""
     db_run = ActualRun(**run.model_dump())
     db.add(db_run)
+    refresh_stats_for_workouts(db, [db_run.planned_workout_id])
+    if db_run.started_at:
+        refresh_training_load(db, db_run.started_at.date())
     db.commit()
     db.refresh(db_run)
     return db_run
 
 
 @router.get("/{run_id}", response_model=RunWithDetails)
-def get_run(run_id: int, db: Session = Depends(get_db)):
+async def get_run(run_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a run with splits and weather."""
-    run = (
-        db.query(ActualRun)
-        .options(
-            joinedload(ActualRun.splits),
-            joinedload(ActualRun.weather),
-        )
-        .filter(ActualRun.id == run_id)
-        .first()
+    run = await db.get(
+        ActualRun,
+        run_id,
+        options=[selectinload(ActualRun.splits), joinedload(ActualRun.weather)],
     )
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     return run
 
 
+@router.get("/{run_id}/raw")
+async def get_run_raw_data(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the raw Garmin activity payload for a run."""
+    raw = await db.get(RunRawData, run_id)
+    if not raw:
+        raise HTTPException(status_code=404, detail="Raw data not found for this run")
+    return raw.unpack()
+
+
+@router.get("/{run_id}/stream")
+async def get_run_stream(
+    run_id: int,
+    start: Optional[int] = Query(None, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    max_points: Optional[int] = Query(None, ge=2, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a run's per-second samples between two offsets (seconds), optionally downsampled."""
+    stream = await read_stream(db, run_id, start, end, max_points)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Stream not found for this run")
+    return stream
+
+
+@router.put("/{run_id}/stream")
+def replace_run_stream(run_id: int, stream: RunStreamUpload, db: Session = Depends(get_db)):
+    """Store a run's per-second samples, replacing any existing stream."""
+    run = db.query(ActualRun.id).filter(ActualRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    try:
+        chunks = store_streams(db, {run_id: stream.model_dump(exclude_none=True)})
+    except InvalidStream as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Stream stored", "samples": len(stream.t), "chunks": chunks}
+
+
 @router.delete("/{run_id}")
 def delete_run(run_id: int, db: Session = Depends(get_db)):
     """Delete a run."""
@@ -74,7 +175,12 @@ def delete_run(run_id: int, db: Session = Depends(get_db)):
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
 
+    workout_id = run.planned_workout_id
+    started_at = run.started_at
     db.delete(run)
+    refresh_stats_for_workouts(db, [workout_id])
+    if started_at:
+        refresh_training_load(db, started_at.date())
     db.commit()
     return {"message": "Run deleted"}
 
@@ -94,6 +200,43 @@ def add_split(run_id: int, split: RunSplitCreate, db: Session = Depends(get_db))
     return db_split
 
 
+@router.put("/{run_id}/splits", response_model=List[RunSplitResponse])
+def replace_splits(run_id: int, splits: List[RunSplitBase], db: Session = Depends(get_db)):
+    """Replace all of a run's splits in one request."""
+    run = db.query(ActualRun).options(joinedload(ActualRun.planned_workout)).filter(ActualRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    numbers = [split.split_number for split in splits]
+    if len(set(numbers)) != len(numbers):
+        raise HTTPException(status_code=400, detail="Duplicate split_number")
+
+    # One DELETE and one multi-row INSERT instead of a statement per split
+    old_ids = [split_id for (split_id,) in db.query(RunSplit.id).filter(RunSplit.run_id == run_id)]
+    db.query(RunSplit).filter(RunSplit.run_id == run_id).delete(synchronize_session=False)
+    new_ids = []
+    if splits:
+        new_ids = list(db.scalars(
+            insert(RunSplit)
+            .values([{"run_id": run_id, **split.model_dump()} for split in splits])
+            .returning(RunSplit.id)
+        ))
+
+    # Bulk statements bypass the ORM write tracking
+    record_changes(db, "splits", old_ids, op="delete")
+    record_changes(db, "splits", new_ids)
+    if run.planned_workout:
+        mark_plans_changed(db, [run.planned_workout.plan_id])
+    db.commit()
+
+    return (
+        db.query(RunSplit)
+        .filter(RunSplit.run_id == run_id)
+        .order_by(RunSplit.split_number)
+        .all()
+    )
+
+
 @router.post("/{run_id}/weather", response_model=RunWeatherResponse)
 def add_weather(run_id: int, weather: RunWeatherCreate, db: Session = Depends(get_db)):
     """Add weather data to a run."""
@@ -121,7 +264,9 @@ def link_run_to_workout(run_id: int, workout_id: int, db: Session = Depends(get_
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
 
+    previous_workout_id = run.planned_workout_id
     run.planned_workout_id = workout_id
+    refresh_stats_for_workouts(db, [previous_workout_id, workout_id])
     db.commit()
     db.refresh(run)
     return run
@@ -1,188 +1,165 @@
 """Stats and analysis API routes."""
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import date, timedelta
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import TrainingPlan, PlannedWorkout, ActualRun
+from app.services.stats import (
+    get_week_stats,
+    plan_summary,
+    weekly_breakdown,
+    race_countdown,
+    hr_zone_totals,
+    rolling_totals,
+)
+from app.services.downsample import lttb
+from app.services.response_cache import response_cache, plan_tag
+from app.services.training_load import get_training_load
 
 router = APIRouter(prefix="/api/stats", tags=["Stats"])
 
+# Limits on /rolling so one request can't build an unbounded day series
+ROLLING_MAX_DAYS = 3 * 366
+ROLLING_MAX_WINDOWS = 6
+ROLLING_MAX_WINDOW_DAYS = 365
+
 
 @router.get("/summary")
-def get_summary(plan_id: int = Query(...), db: Session = Depends(get_db)):
+async def get_summary(request: Request, plan_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
     """Get overall training summary stats."""
-    plan = db.query(TrainingPlan).filter(TrainingPlan.id == plan_id).first()
-    if not plan:
-        return {"error": "Plan not found"}
-
-    # Count workouts and completions
-    total_workouts = db.query(PlannedWorkout).filter(PlannedWorkout.plan_id == plan_id).count()
-    run_workouts = (
-        db.query(PlannedWorkout)
-        .filter(PlannedWorkout.plan_id == plan_id)
-        .filter(PlannedWorkout.workout_type.notin_(["Rest", "Mobility"]))
-        .count()
-    )
-    completed_runs = (
-        db.query(PlannedWorkout)
-        .join(ActualRun)
-        .filter(PlannedWorkout.plan_id == plan_id)
-        .count()
-    )
-
-    # Total miles planned vs completed
-    total_planned = (
-        db.query(func.sum(PlannedWorkout.target_distance))
-        .filter(PlannedWorkout.plan_id == plan_id)
-        .scalar() or 0
-    )
-    total_actual = (
-        db.query(func.sum(ActualRun.distance))
-        .join(PlannedWorkout)
-        .filter(PlannedWorkout.plan_id == plan_id)
-        .scalar() or 0
-    )
-
-    # Days until race
-    days_until_race = (plan.race_date - date.today()).days
-
-    # Current week
-    if plan.start_date <= date.today():
-        days_since_start = (date.today() - plan.start_date).days
-        current_week = min((days_since_start // 7) + 1, 10)
-    else:
-        current_week = 0
-
-    return {
-        "plan_name": plan.name,
-        "race_date": plan.race_date.isoformat(),
-        "days_until_race": days_until_race,
-        "current_week": current_week,
-        "total_workouts": total_workouts,
-        "run_workouts": run_workouts,
-        "completed_runs": completed_runs,
-        "completion_rate": round(completed_runs / run_workouts * 100, 1) if run_workouts > 0 else 0,
-        "total_planned_miles": round(total_planned, 1),
-        "total_actual_miles": round(total_actual, 1),
-        "miles_remaining": round(total_planned - total_actual, 1),
-    }
+    async def build():
+        plan = await db.get(TrainingPlan, plan_id)
+        if not plan:
+            return {"error": "Plan not found"}
+
+        # Totals across the plan's materialized weekly rollups
+        weeks = await db.run_sync(get_week_stats, plan_id)
+        return plan_summary(plan, weeks)
+
+    return await response_cache.respond(request, [plan_tag(plan_id)], build)
 
 
 @router.get("/weekly")
-def get_weekly_stats(plan_id: int = Query(...), db: Session = Depends(get_db)):
+async def get_weekly_stats(request: Request, plan_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
     """Get weekly mileage breakdown."""
-    weeks = []
-    for week_num in range(1, 11):
-        # Planned miles
-        planned = (
-            db.query(func.sum(PlannedWorkout.target_distance))
-            .filter(PlannedWorkout.plan_id == plan_id)
-            .filter(PlannedWorkout.week == week_num)
-            .scalar() or 0
-        )
+    async def build():
+        return weekly_breakdown(await db.run_sync(get_week_stats, plan_id))
 
-        # Actual miles
-        actual = (
-            db.query(func.sum(ActualRun.distance))
-            .join(PlannedWorkout)
-            .filter(PlannedWorkout.plan_id == plan_id)
-            .filter(PlannedWorkout.week == week_num)
-            .scalar() or 0
-        )
+    return await response_cache.respond(request, [plan_tag(plan_id)], build)
 
-        # Workouts completed
-        completed = (
-            db.query(PlannedWorkout)
-            .join(ActualRun)
-            .filter(PlannedWorkout.plan_id == plan_id)
-            .filter(PlannedWorkout.week == week_num)
-            .count()
-        )
 
-        total_runs = (
-            db.query(PlannedWorkout)
+@router.get("/pace-trend")
+async def get_pace_trend(
+    request: Request,
+    plan_id: int = Query(...),
+    max_points: Optional[int] = Query(None, ge=2, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get pace trend over time, downsampled to at most ``max_points`` runs."""
+    async def build():
+        result = await db.execute(
+            select(
+                ActualRun.started_at,
+                ActualRun.pace,
+                ActualRun.pace_seconds,
+                ActualRun.distance,
+                PlannedWorkout.workout_type,
+            )
+            .join(ActualRun.planned_workout)
             .filter(PlannedWorkout.plan_id == plan_id)
-            .filter(PlannedWorkout.week == week_num)
-            .filter(PlannedWorkout.workout_type.notin_(["Rest", "Mobility"]))
-            .count()
+            .order_by(ActualRun.started_at)
         )
 
-        weeks.append({
-            "week": week_num,
-            "planned_miles": round(planned, 1),
-            "actual_miles": round(actual, 1),
-            "total_runs": total_runs,
-            "completed_runs": completed,
-        })
-
-    return weeks
-
-
-@router.get("/pace-trend")
-def get_pace_trend(plan_id: int = Query(...), db: Session = Depends(get_db)):
-    """Get pace trend over time."""
-    runs = (
-        db.query(ActualRun)
-        .join(PlannedWorkout)
-        .filter(PlannedWorkout.plan_id == plan_id)
-        .order_by(ActualRun.started_at)
-        .all()
-    )
-
-    return [
-        {
-            "date": run.started_at.isoformat() if run.started_at else None,
-            "pace": run.pace,
-            "pace_seconds": run.pace_seconds,
-            "distance": run.distance,
-            "workout_type": run.planned_workout.workout_type if run.planned_workout else None,
-        }
-        for run in runs
-    ]
+        rows = result.all()
+        if max_points is not None:
+            # Runs without a time or pace can't be placed on the chart
+            rows = lttb(
+                [r for r in rows if r.started_at and r.pace_seconds is not None],
+                max_points,
+                x=lambda r: r.started_at.timestamp(),
+                y=lambda r: r.pace_seconds,
+            )
+
+        return [
+            {
+                "date": started_at.isoformat() if started_at else None,
+                "pace": pace,
+                "pace_seconds": pace_seconds,
+                "distance": distance,
+                "workout_type": workout_type,
+            }
+            for started_at, pace, pace_seconds, distance, workout_type in rows
+        ]
+
+    return await response_cache.respond(request, [plan_tag(plan_id)], build)
 
 
 @router.get("/hr-zones")
-def get_hr_zone_distribution(plan_id: int = Query(...), db: Session = Depends(get_db)):
-    """Get aggregate HR zone distribution."""
-    runs = (
-        db.query(ActualRun)
-        .join(PlannedWorkout)
-        .filter(PlannedWorkout.plan_id == plan_id)
-        .filter(ActualRun.hr_zones.isnot(None))
-        .all()
-    )
-
-    total_zones = {"zone1": 0, "zone2": 0, "zone3": 0, "zone4": 0, "zone5": 0}
-    for run in runs:
-        if run.hr_zones:
-            for zone, seconds in run.hr_zones.items():
-                if zone in total_zones:
-                    total_zones[zone] += seconds
-
-    return total_zones
+async def get_hr_zone_distribution(
+    request: Request,
+    plan_id: int = Query(...),
+    group_by: Optional[str] = Query(None, pattern="^(week|workout_type)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get aggregate HR zone distribution, optionally per week or workout type."""
+    async def build():
+        return await db.run_sync(hr_zone_totals, plan_id, group_by)
+
+    return await response_cache.respond(request, [plan_tag(plan_id)], build)
 
 
 @router.get("/countdown")
-def get_countdown(plan_id: int = Query(...), db: Session = Depends(get_db)):
+async def get_countdown(request: Request, plan_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
     """Get race countdown info."""
-    plan = db.query(TrainingPlan).filter(TrainingPlan.id == plan_id).first()
-    if not plan:
-        return {"error": "Plan not found"}
-
-    today = date.today()
-    days_left = (plan.race_date - today).days
-    weeks_left = days_left // 7
-    days_remainder = days_left % 7
-
-    return {
-        "race_date": plan.race_date.isoformat(),
-        "race_name": plan.name,
-        "days_left": days_left,
-        "weeks_left": weeks_left,
-        "days_remainder": days_remainder,
-        "target_pace": plan.target_pace,
-        "target_time": plan.target_time,
-    }
+    async def build():
+        plan = await db.get(TrainingPlan, plan_id)
+        if not plan:
+            return {"error": "Plan not found"}
+        return race_countdown(plan)
+
+    return await response_cache.respond(request, [plan_tag(plan_id)], build)
+
+
+@router.get("/training-load")
+async def get_training_load_series(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get daily training load with fatigue (ATL), fitness (CTL) and form (TSB).
+
+    Defaults to the last 90 days. Covers all runs, not one plan.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=90)
+    return await db.run_sync(get_training_load, start, end)
+
+
+@router.get("/rolling")
+async def get_rolling_totals(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    windows: List[int] = Query([7, 28]),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get trailing mileage, time on feet (seconds) and run count per day.
+
+    Each ``windows`` value (in days) adds ``miles_Nd``, ``seconds_Nd`` and
+    ``runs_Nd`` to every day. Defaults to the last 90 days. Covers all runs.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=90)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days > ROLLING_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {ROLLING_MAX_DAYS} days")
+    windows = sorted(set(windows))
+    if len(windows) > ROLLING_MAX_WINDOWS or not all(1 <= w <= ROLLING_MAX_WINDOW_DAYS for w in windows):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Up to {ROLLING_MAX_WINDOWS} windows of 1-{ROLLING_MAX_WINDOW_DAYS} days",
+        )
+    return await db.run_sync(rolling_totals, start, end, windows)
@@ -1,12 +1,16 @@
 """Garmin sync API routes."""
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date
+import json
 import os
 
 from app.database import get_db
 from app.services.garmin_sync import GarminSyncService, TOKEN_PATH
+from app.services.sync_cursors import DATA_TYPES, get_cursors
+from app.services.sync_jobs import sync_jobs
 
 router = APIRouter(prefix="/api/sync", tags=["Sync"])
 
@@ -14,10 +18,19 @@ router = APIRouter(prefix="/api/sync", tags=["Sync"])
 garmin_service: Optional[GarminSyncService] = None
 
 
+def _ensure_no_running_jobs():
+    """Refuse to replace or close the Garmin session while a sync job is using it."""
+    if sync_jobs.running():
+        raise HTTPException(status_code=409, detail="A Garmin sync is running; try again when it finishes")
+
+
 @router.post("/garmin/login")
 async def garmin_login(email: str = Query(...), password: str = Query(...)):
     """Login to Garmin Connect."""
     global garmin_service
+    _ensure_no_running_jobs()
+    if garmin_service is not None:
+        await garmin_service.close()
     try:
         garmin_service = GarminSyncService(email, password)
         await garmin_service.login()
@@ -46,20 +59,22 @@ async def sync_activities(
     plan_id: int = Query(...),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
+    mode: str = Query("incremental", pattern="^(incremental|full)$"),
 ):
-    """Sync activities from Garmin Connect."""
+    """Start a background sync of activities from Garmin Connect.
+
+    Returns immediately with a job ID; poll ``/api/sync/jobs/{job_id}`` or
+    stream ``/api/sync/jobs/{job_id}/events`` for progress. A sync already
+    running for the same plan and range is reused, whatever its mode. ``incremental`` syncs
+    resume from the plan's last successful sync; ``full`` re-syncs the plan.
+    """
     global garmin_service
 
     # Try to use saved tokens if no active session
     if garmin_service is None and os.path.exists(TOKEN_PATH):
         try:
-            from garminconnect import Garmin
             garmin_service = GarminSyncService("", "")
-            garmin_service.client = Garmin()
-            garmin_service.client.garth.load(TOKEN_PATH)
-            # Test connection
-            garmin_service.client.display_name
+            await garmin_service.resume(TOKEN_PATH)
             print("Using saved Garmin tokens")
         except Exception as e:
             print(f"Failed to load saved tokens: {e}")
@@ -68,28 +83,60 @@ async def sync_activities(
     if garmin_service is None or garmin_service.client is None:
         raise HTTPException(status_code=401, detail="Not connected to Garmin. Please login first or run: python garmin_login.py")
 
-    try:
-        synced = await garmin_service.sync_activities(
-            db=db,
-            plan_id=plan_id,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        return {
-            "status": "success",
-            "activities_synced": len(synced),
-            "activities": synced,
-        }
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
+    job, created = sync_jobs.enqueue(garmin_service, plan_id, start_date, end_date, mode)
+    return {**job.to_dict(), "reused": not created}
+
+
+@router.get("/cursors")
+def get_sync_cursors(plan_id: int = Query(...), db: Session = Depends(get_db)):
+    """Get the last synced date for each data type of a plan."""
+    cursors = get_cursors(db, plan_id)
+    return {
+        data_type: cursors[data_type].isoformat() if data_type in cursors else None
+        for data_type in DATA_TYPES
+    }
+
+
+@router.get("/jobs")
+async def list_sync_jobs():
+    """List recent sync jobs, newest first."""
+    return [job.to_dict() for job in sync_jobs.recent()]
+
+
+@router.get("/jobs/{job_id}")
+async def get_sync_job(job_id: str):
+    """Get a sync job's status and progress."""
+    job = sync_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_sync_job(job_id: str):
+    """Stream a sync job's progress as server-sent events until it finishes."""
+    job = sync_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+
+    async def events():
+        while True:
+            seen = job.version
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+            if job.done:
+                return
+            await job.wait_for_change(seen, timeout=15)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 
 @router.post("/garmin/logout")
 async def garmin_logout():
     """Logout from Garmin Connect."""
     global garmin_service
+    _ensure_no_running_jobs()
+    if garmin_service is not None:
+        await garmin_service.close()
     garmin_service = None
 
     # Remove saved tokens
@@ -1,11 +1,16 @@
 """Planned workout API routes."""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
 from datetime import date
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import PlannedWorkout, ActualRun
+from app.services.stats import refresh_week_stats
+from app.services.plan_changes import get_plan_version
+from app.services.response_cache import response_cache, plan_tag, plan_etag
 from app.schemas import (
     PlannedWorkoutCreate,
     PlannedWorkoutUpdate,
@@ -15,24 +20,27 @@ from app.schemas import (
 
 router = APIRouter(prefix="/api/workouts", tags=["Workouts"])
 
+# Everything WorkoutWithDetails serializes; async sessions can't lazy-load
+WORKOUT_DETAILS = (
+    joinedload(PlannedWorkout.actual_run).options(
+        selectinload(ActualRun.splits),
+        joinedload(ActualRun.weather),
+    ),
+    joinedload(PlannedWorkout.note),
+)
+
 
 @router.get("/", response_model=List[WorkoutWithDetails])
-def list_workouts(
+async def list_workouts(
     plan_id: Optional[int] = Query(None),
     week: Optional[int] = Query(None),
     workout_type: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List workouts with optional filters."""
-    query = (
-        db.query(PlannedWorkout)
-        .options(
-            joinedload(PlannedWorkout.actual_run).joinedload(ActualRun.weather),
-            joinedload(PlannedWorkout.note),
-        )
-    )
+    query = select(PlannedWorkout).options(*WORKOUT_DETAILS)
 
     if plan_id:
         query = query.filter(PlannedWorkout.plan_id == plan_id)
@@ -45,7 +53,8 @@ def list_workouts(
     if end_date:
         query = query.filter(PlannedWorkout.date <= end_date)
 
-    return query.order_by(PlannedWorkout.date).all()
+    result = await db.execute(query.order_by(PlannedWorkout.date))
+    return result.scalars().all()
 
 
 @router.post("/", response_model=PlannedWorkoutResponse)
@@ -53,24 +62,21 @@ def create_workout(workout: PlannedWorkoutCreate, db: Session = Depends(get_db))
     """Create a new planned workout."""
     db_workout = PlannedWorkout(**workout.model_dump())
     db.add(db_workout)
+    refresh_week_stats(db, db_workout.plan_id, [db_workout.week])
     db.commit()
     db.refresh(db_workout)
     return db_workout
 
 
 @router.get("/{workout_id}", response_model=WorkoutWithDetails)
-def get_workout(workout_id: int, db: Session = Depends(get_db)):
+async def get_workout(workout_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a workout with actual run and notes."""
-    workout = (
-        db.query(PlannedWorkout)
-        .options(
-            joinedload(PlannedWorkout.actual_run).joinedload(ActualRun.splits),
-            joinedload(PlannedWorkout.actual_run).joinedload(ActualRun.weather),
-            joinedload(PlannedWorkout.note),
-        )
+    result = await db.execute(
+        select(PlannedWorkout)
+        .options(*WORKOUT_DETAILS)
         .filter(PlannedWorkout.id == workout_id)
-        .first()
     )
+    workout = result.scalars().first()
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     return workout
@@ -83,10 +89,12 @@ def update_workout(workout_id: int, workout_update: PlannedWorkoutUpdate, db: Se
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
 
+    previous_week = workout.week
     update_data = workout_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(workout, field, value)
 
+    refresh_week_stats(db, workout.plan_id, [previous_week, workout.week])
     db.commit()
     db.refresh(workout)
     return workout
@@ -99,40 +107,40 @@ def delete_workout(workout_id: int, db: Session = Depends(get_db)):
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
 
+    plan_id, week = workout.plan_id, workout.week
     db.delete(workout)
+    refresh_week_stats(db, plan_id, [week])
     db.commit()
     return {"message": "Workout deleted"}
 
 
 @router.get("/today/", response_model=Optional[WorkoutWithDetails])
-def get_todays_workout(plan_id: int = Query(...), db: Session = Depends(get_db)):
+async def get_todays_workout(plan_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
     """Get today's planned workout."""
     today = date.today()
-    workout = (
-        db.query(PlannedWorkout)
-        .options(
-            joinedload(PlannedWorkout.actual_run),
-            joinedload(PlannedWorkout.note),
-        )
+    result = await db.execute(
+        select(PlannedWorkout)
+        .options(*WORKOUT_DETAILS)
         .filter(PlannedWorkout.plan_id == plan_id)
         .filter(PlannedWorkout.date == today)
-        .first()
     )
-    return workout
+    return result.scalars().first()
 
 
 @router.get("/week/{week_num}", response_model=List[WorkoutWithDetails])
-def get_week_workouts(week_num: int, plan_id: int = Query(...), db: Session = Depends(get_db)):
+async def get_week_workouts(request: Request, week_num: int, plan_id: int = Query(...), db: AsyncSession = Depends(get_async_db)):
     """Get all workouts for a specific week."""
-    workouts = (
-        db.query(PlannedWorkout)
-        .options(
-            joinedload(PlannedWorkout.actual_run),
-            joinedload(PlannedWorkout.note),
+    version = await get_plan_version(db, plan_id)
+    etag = plan_etag(plan_id, version) if version is not None else None
+
+    async def build():
+        result = await db.execute(
+            select(PlannedWorkout)
+            .options(*WORKOUT_DETAILS)
+            .filter(PlannedWorkout.plan_id == plan_id)
+            .filter(PlannedWorkout.week == week_num)
+            .order_by(PlannedWorkout.date)
         )
-        .filter(PlannedWorkout.plan_id == plan_id)
-        .filter(PlannedWorkout.week == week_num)
-        .order_by(PlannedWorkout.date)
-        .all()
-    )
-    return workouts
+        return [WorkoutWithDetails.model_validate(w) for w in result.scalars()]
+
+    return await response_cache.respond(request, [plan_tag(plan_id)], build, etag=etag)
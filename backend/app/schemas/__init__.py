@@ -13,11 +13,14 @@ from app.schemas.workout import (
 from app.schemas.run import (
     ActualRunCreate,
     ActualRunResponse,
+    RunSplitBase,
     RunSplitCreate,
     RunSplitResponse,
     RunWeatherCreate,
     RunWeatherResponse,
     RunWithDetails,
+    RunPage,
+    RunStreamUpload,
 )
 from app.schemas.note import (
     RunNoteCreate,
@@ -36,11 +39,14 @@ __all__ = [
     "WorkoutWithDetails",
     "ActualRunCreate",
     "ActualRunResponse",
+    "RunSplitBase",
     "RunSplitCreate",
     "RunSplitResponse",
     "RunWeatherCreate",
     "RunWeatherResponse",
     "RunWithDetails",
+    "RunPage",
+    "RunStreamUpload",
     "RunNoteCreate",
     "RunNoteUpdate",
     "RunNoteResponse",
@@ -87,3 +87,19 @@ class RunWithDetails(ActualRunResponse):
 
     class Config:
         from_attributes = True
+
+
+class RunPage(BaseModel):
+    runs: List[RunWithDetails] = []
+    next_cursor: Optional[str] = None  # pass as ?cursor= to fetch the next page
+
+
+class RunStreamUpload(BaseModel):
+    """Per-sample channels of equal length; None marks a missing sample."""
+    t: List[float]  # seconds from the start of the run, non-decreasing
+    hr: Optional[List[Optional[float]]] = None
+    pace: Optional[List[Optional[float]]] = None  # seconds per mile
+    cadence: Optional[List[Optional[float]]] = None
+    elevation: Optional[List[Optional[float]]] = None  # meters
+    lat: Optional[List[Optional[float]]] = None
+    lon: Optional[List[Optional[float]]] = None
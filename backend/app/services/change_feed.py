@@ -0,0 +1,189 @@
+"""Change log for incremental client sync.
+
+Mapper events append one ``change_log`` row per inserted, updated or deleted
+plan, workout, run, note, split or weather row, in the same transaction as
+the write. Bulk ``insert()``/``update()`` statements bypass mapper events;
+callers using them must call ``record_changes``.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import os
+
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.models import (
+    ChangeLog,
+    TrainingPlan,
+    PlannedWorkout,
+    ActualRun,
+    RunSplit,
+    RunWeather,
+    RunNote,
+)
+from app.schemas import (
+    TrainingPlanResponse,
+    PlannedWorkoutResponse,
+    ActualRunResponse,
+    RunNoteResponse,
+    RunSplitResponse,
+    RunWeatherResponse,
+)
+
+# Change log rows older than this are pruned; clients behind them must reload
+CHANGE_LOG_RETENTION_DAYS = int(os.environ.get("CHANGE_LOG_RETENTION_DAYS", "30"))
+
+# Pseudo-entity written by pruning; its entity_id is the highest pruned seq
+PRUNED_ENTITY = "_pruned"
+
+# Postgres advisory lock making change_log writers commit in seq order
+CHANGE_LOG_LOCK_KEY = 2026041103
+
+# Feed entity name -> model, response schema, parent key not in the schema
+ENTITIES: Dict[str, Tuple[Any, type, Optional[str]]] = {
+    "plans": (TrainingPlan, TrainingPlanResponse, None),
+    "workouts": (PlannedWorkout, PlannedWorkoutResponse, None),
+    "runs": (ActualRun, ActualRunResponse, None),
+    "notes": (RunNote, RunNoteResponse, None),
+    "splits": (RunSplit, RunSplitResponse, "run_id"),
+    "weather": (RunWeather, RunWeatherResponse, "run_id"),
+}
+
+PENDING_KEY = "change_feed_pending"
+
+
+class CursorExpired(Exception):
+    """The requested cursor is older than the retained change log."""
+
+
+def record_changes(db: Session, entity: str, ids: Iterable[int], op: str = "upsert"):
+    """Log changes made by bulk statements, in the session's transaction."""
+    _write(db, [(entity, entity_id, op) for entity_id in ids])
+
+
+def _write(session: Session, changes: List[Tuple[str, int, str]]):
+    if not changes:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        # Without this a later seq could commit first and a polling client would skip the earlier one
+        session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK_KEY})
+    now = datetime.utcnow()
+    session.execute(insert(ChangeLog), [
+        {"entity": entity, "entity_id": entity_id, "op": op, "changed_at": now}
+        for entity, entity_id, op in changes
+    ])
+
+
+def _listen(model, entity: str):
+    def changed(op):
+        def handler(mapper, connection, target):
+            session = object_session(target)
+            if session is not None:
+                session.info.setdefault(PENDING_KEY, []).append((entity, target.id, op))
+        return handler
+
+    event.listen(model, "after_insert", changed("upsert"))
+    event.listen(model, "after_update", changed("upsert"))
+    event.listen(model, "after_delete", changed("delete"))
+
+
+for _entity, (_model, _schema, _parent) in ENTITIES.items():
+    _listen(_model, _entity)
+
+
+@event.listens_for(Session, "after_flush")
+def _write_pending(session, flush_context):
+    _write(session, session.info.pop(PENDING_KEY, []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+async def current_cursor(db: AsyncSession) -> int:
+    """Sequence number of the latest logged change."""
+    return await db.scalar(select(func.coalesce(func.max(ChangeLog.seq), 0)))
+
+
+async def changes_since(db: AsyncSession, since: int, limit: int) -> Dict[str, Any]:
+    """Latest state of every row changed after ``since``, oldest change first.
+
+    Several changes to one row collapse into one entry. Rows that no longer
+    exist are returned as tombstones.
+    """
+    pruned_through = await db.scalar(
+        select(func.max(ChangeLog.entity_id)).filter(ChangeLog.entity == PRUNED_ENTITY)
+    )
+    if pruned_through is not None and since < pruned_through:
+        raise CursorExpired()
+
+    latest = (
+        select(ChangeLog.entity, ChangeLog.entity_id, func.max(ChangeLog.seq).label("seq"))
+        .filter(ChangeLog.seq > since, ChangeLog.entity != PRUNED_ENTITY)
+        .group_by(ChangeLog.entity, ChangeLog.entity_id)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(latest.c.entity, latest.c.entity_id, latest.c.seq, ChangeLog.op)
+        .join(ChangeLog, ChangeLog.seq == latest.c.seq)
+        .order_by(latest.c.seq)
+        .limit(limit + 1)
+    )).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # One query per entity type for the rows still present
+    wanted: Dict[str, List[int]] = {}
+    for entity, entity_id, _, op in rows:
+        if op != "delete":
+            wanted.setdefault(entity, []).append(entity_id)
+    current: Dict[Tuple[str, int], Any] = {}
+    for entity, ids in wanted.items():
+        model = ENTITIES[entity][0]
+        for obj in (await db.execute(select(model).filter(model.id.in_(ids)))).scalars():
+            current[(entity, obj.id)] = obj
+
+    changes = []
+    for entity, entity_id, seq, op in rows:
+        obj = current.get((entity, entity_id))
+        if obj is None:
+            changes.append({"entity": entity, "id": entity_id, "seq": seq, "op": "delete"})
+            continue
+        _, schema, parent = ENTITIES[entity]
+        data = schema.model_validate(obj).model_dump(mode="json")
+        if parent:
+            data[parent] = getattr(obj, parent)
+        changes.append({"entity": entity, "id": entity_id, "seq": seq, "op": "upsert", "data": data})
+
+    return {
+        "cursor": rows[-1].seq if rows else since,
+        "has_more": has_more,
+        "changes": changes,
+    }
+
+
+def prune_change_log(db: Session, retention_days: int = CHANGE_LOG_RETENTION_DAYS) -> int:
+    """Delete change log rows past the retention window. Does not commit.
+
+    Leaves a marker so clients with older cursors are told to reload.
+    Returns the number of rows deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    pruned_through = db.scalar(
+        select(func.max(ChangeLog.seq))
+        .filter(ChangeLog.changed_at < cutoff, ChangeLog.entity != PRUNED_ENTITY)
+    )
+    if pruned_through is None:
+        return 0
+
+    deleted = (
+        db.query(ChangeLog)
+        .filter(ChangeLog.seq <= pruned_through, ChangeLog.entity != PRUNED_ENTITY)
+        .delete(synchronize_session=False)
+    )
+    db.query(ChangeLog).filter(ChangeLog.entity == PRUNED_ENTITY).delete(synchronize_session=False)
+    db.add(ChangeLog(entity=PRUNED_ENTITY, entity_id=pruned_through, op="delete"))
+    db.flush()
+    return deleted
@@ -0,0 +1,50 @@
+"""Downsampling for chart series."""
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def lttb(
+    points: Sequence[T],
+    max_points: int,
+    x: Callable[[T], float],
+    y: Callable[[T], float],
+) -> List[T]:
+    """Largest-Triangle-Three-Buckets: keep ``max_points`` points that preserve the series' shape.
+
+    Points are assumed sorted by ``x``. The first and last points are always
+    kept; every other kept point is one of the input points, unchanged.
+    """
+    if max_points >= len(points) or len(points) <= 2:
+        return list(points)
+    if max_points < 3:
+        return [points[0], points[-1]][:max_points]
+
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (max_points - 2)
+    previous = points[0]
+
+    for i in range(max_points - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket (or the last point, for the final bucket)
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, len(points) - 1)
+        following = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(x(p) for p in following) / len(following)
+        avg_y = sum(y(p) for p in following) / len(following)
+
+        # Keep the point forming the largest triangle with the previous pick and that average
+        prev_x, prev_y = x(previous), y(previous)
+        best: Optional[T] = None
+        best_area = -1.0
+        for p in points[start:end]:
+            area = abs((prev_x - avg_x) * (y(p) - prev_y) - (prev_x - x(p)) * (avg_y - prev_y))
+            if area > best_area:
+                best, best_area = p, area
+        sampled.append(best)
+        previous = best
+
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,51 @@
+"""Async adapter for the blocking garminconnect client."""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, List, Dict, Any, Callable
+import asyncio
+import os
+
+from garminconnect import Garmin
+
+# Worker threads for concurrent Garmin calls (override with GARMIN_WORKERS)
+DEFAULT_WORKERS = int(os.environ.get("GARMIN_WORKERS", "4"))
+
+# Samples requested per activity for per-second streams (7 hours)
+DETAIL_MAX_SAMPLES = 25200
+
+
+class AsyncGarminClient:
+    """Runs garminconnect calls in a thread pool so they don't block the event loop."""
+
+    def __init__(self, client: Optional[Garmin] = None, max_workers: Optional[int] = None):
+        self.client = client
+        self.max_workers = max_workers or DEFAULT_WORKERS
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="garmin",
+        )
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking callable in the adapter's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_activities_by_date(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        return await self.run(self.client.get_activities_by_date, start_date, end_date)
+
+    async def get_sleep_data(self, cdate: str) -> Dict[str, Any]:
+        return await self.run(self.client.get_sleep_data, cdate)
+
+    async def get_hrv_data(self, cdate: str) -> Dict[str, Any]:
+        return await self.run(self.client.get_hrv_data, cdate)
+
+    async def get_activity_splits(self, activity_id: str) -> Dict[str, Any]:
+        return await self.run(self.client.get_activity_splits, activity_id)
+
+    async def get_activity_details(self, activity_id: str) -> Dict[str, Any]:
+        # Garmin returns at most maxchart samples; allow one per second for long runs
+        return await self.run(self.client.get_activity_details, activity_id, maxchart=DETAIL_MAX_SAMPLES)
+
+    def shutdown(self):
+        """Stop the worker threads once pending calls finish."""
+        self._executor.shutdown(wait=False)
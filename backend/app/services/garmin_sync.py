@@ -1,30 +1,81 @@
 """Garmin Connect sync service."""
-from garminconnect import Garmin
+from garminconnect import Garmin, GarminConnectConnectionError, GarminConnectTooManyRequestsError
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from datetime import date, datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
 import os
 
-from app.models import PlannedWorkout, ActualRun, TrainingPlan, RunWeather
+from app.database import dialect_insert
+from app.models import PlannedWorkout, ActualRun, TrainingPlan, RunWeather, RunRawData, RunSplit, RunStream
+from app.models.run import HR_ZONE_COUNT
+from app.services.garmin_client import AsyncGarminClient
+from app.services.rate_limit import TokenBucket, retry_with_backoff
+from app.services.change_feed import record_changes
+from app.services.plan_changes import mark_plans_changed
+from app.services.splits import laps_to_mile_splits
+from app.services.streams import InvalidStream, build_stream, write_streams
 from app.services.weather import WeatherService
+from app.services.stats import NON_RUN_TYPES, refresh_stats_for_workouts
+from app.services.training_load import refresh_training_load
+from app.services.sync_cursors import SYNC_MODES, advance_cursor, sync_start
 
 # Token storage path
 TOKEN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".garmin_tokens")
 
+# Rows per multi-row INSERT, keeping bound parameters under SQLite's limit
+INSERT_BATCH_SIZE = 500
+
+# Request budget for per-day and per-activity Garmin endpoints (sleep, HRV, splits)
+GARMIN_RATE_PER_SECOND = float(os.environ.get("GARMIN_RATE_PER_SECOND", "4"))
+GARMIN_RATE_BURST = int(os.environ.get("GARMIN_RATE_BURST", "8"))
+
+# Per-second activity details are large; set GARMIN_SYNC_STREAMS=false to skip them
+SYNC_RUN_STREAMS = os.environ.get("GARMIN_SYNC_STREAMS", "true").lower() == "true"
+
+# Transient Garmin errors worth retrying
+RETRYABLE_ERRORS = (GarminConnectConnectionError, GarminConnectTooManyRequestsError)
+
+
+async def _in_thread(func, *args):
+    """Run blocking database work in a worker thread so the event loop keeps serving requests.
+
+    A sync's session is only used by one of these calls at a time, never concurrently.
+    """
+    return await asyncio.to_thread(func, *args)
+
 
 class GarminSyncService:
     """Service for syncing data from Garmin Connect."""
 
-    def __init__(self, email: str, password: str):
+    def __init__(self, email: str, password: str, max_workers: Optional[int] = None):
         self.email = email
         self.password = password
-        self.client: Optional[Garmin] = None
+        self.api = AsyncGarminClient(max_workers=max_workers)
         self.weather_service = WeatherService()
 
+    @property
+    def client(self) -> Optional[Garmin]:
+        """The underlying synchronous garminconnect client."""
+        return self.api.client
+
+    @client.setter
+    def client(self, client: Optional[Garmin]):
+        self.api.client = client
+
+    async def close(self):
+        """Release the Garmin thread pool and the weather HTTP client."""
+        self.api.shutdown()
+        await self.weather_service.aclose()
+
     async def login(self):
         """Authenticate with Garmin Connect."""
         self.client = Garmin(self.email, self.password)
+        await self.api.run(self._login_blocking)
 
+    def _login_blocking(self):
+        """Load saved tokens or log in fresh. Runs in the Garmin thread pool."""
         # Try to load saved tokens first
         if os.path.exists(TOKEN_PATH):
             try:
@@ -43,30 +94,39 @@ class GarminSyncService:
         self.client.garth.dump(TOKEN_PATH)
         print("Garmin login successful, tokens saved")
 
-    async def sync_activities(
+    async def resume(self, token_path: str = TOKEN_PATH):
+        """Attach a client using previously saved tokens."""
+        client = Garmin()
+        await self.api.run(client.garth.load, token_path)
+        # Test connection
+        client.display_name
+        self.client = client
+
+    def resolve_sync_range(
         self,
         db: Session,
         plan_id: int,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-    ) -> List[Dict[str, Any]]:
-        """Sync all running activities from Garmin for the training plan period."""
-        if not self.client:
-            raise ValueError("Not logged in to Garmin")
+        mode: str = "incremental",
+    ) -> Tuple[Optional[TrainingPlan], date, date]:
+        """Work out the date range a sync should cover for a plan."""
+        if mode not in SYNC_MODES:
+            raise ValueError(f"Unknown sync mode: {mode}")
 
         # Get the training plan dates
         plan = db.query(TrainingPlan).filter(TrainingPlan.id == plan_id).first()
+        end_date = end_date or date.today()
         if plan:
-            start_date = start_date or plan.start_date
-            end_date = end_date or date.today()
-        else:
-            start_date = start_date or (date.today() - timedelta(days=60))
-            end_date = end_date or date.today()
-
-        print(f"Syncing Garmin activities from {start_date} to {end_date}")
+            start_date = sync_start(db, plan, "activities", mode, start_date)
+        elif start_date is None:
+            start_date = date.today() - timedelta(days=60)
+        return plan, start_date, end_date
 
+    async def fetch_running_activities(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """Fetch activities in a date range and keep the running ones."""
         # Fetch all activities and filter locally for running types
-        all_activities = self.client.get_activities_by_date(
+        all_activities = await self.api.get_activities_by_date(
             start_date.isoformat(),
             end_date.isoformat(),
         )
@@ -78,89 +138,85 @@ class GarminSyncService:
         ]
 
         print(f"Found {len(activities)} running activities (out of {len(all_activities)} total)")
+        return activities
 
-        synced = []
-        for activity in activities:
-            activity_id = str(activity.get("activityId"))
-
-            # Skip if already synced
-            existing = db.query(ActualRun).filter(ActualRun.garmin_activity_id == activity_id).first()
-            if existing:
-                # If existing run has no weather, try to fetch it
-                if not existing.weather and existing.start_lat and existing.started_at:
-                    await self._fetch_weather_for_run(db, existing)
-                print(f"Activity {activity_id} already synced, skipping")
-                continue
-
-            # Parse the activity date
-            activity_date = self._parse_date(activity.get("startTimeLocal"))
-
-            # Parse activity data
-            distance = (activity.get("distance") or 0) / 1609.344  # meters to miles
-            duration = int(activity.get("duration") or 0)  # seconds
-
-            # Calculate pace
-            if distance > 0:
-                pace_sec = int(duration / distance)
-                pace = f"{pace_sec // 60}:{pace_sec % 60:02d}/mi"
-            else:
-                pace_sec = 0
-                pace = "0:00/mi"
+    async def sync_activities(
+        self,
+        db: Session,
+        plan_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        progress=None,
+        mode: str = "incremental",
+        activities: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Sync all running activities from Garmin for the training plan period.
+
+        In ``incremental`` mode, a sync without an explicit start date resumes
+        each data type (activities, weather, sleep, HRV) from its own cursor
+        (minus a small overlap for late uploads); ``full`` re-syncs the whole
+        plan. ``progress`` optionally
+        receives counter updates and errors as the sync runs (see ``SyncJob``).
+        ``activities`` may carry running activities already fetched for a
+        wider range (e.g. shared across plans); only those in this plan's
+        range are used and Garmin is not queried for them again.
+        """
+        if not self.client:
+            raise ValueError("Not logged in to Garmin")
 
-            # Find matching planned workout by date
-            planned = None
-            if activity_date:
-                planned = (
-                    db.query(PlannedWorkout)
-                    .filter(PlannedWorkout.plan_id == plan_id)
-                    .filter(PlannedWorkout.date == activity_date)
-                    .filter(PlannedWorkout.workout_type.notin_(["Rest", "Mobility"]))
-                    .first()
-                )
+        requested_start = start_date
+        plan, start_date, end_date = await _in_thread(self.resolve_sync_range, db, plan_id, start_date, end_date, mode)
 
-                # If workout already has a run, skip
-                if planned and planned.actual_run:
-                    print(f"Workout on {activity_date} already has a run, skipping")
-                    continue
+        print(f"Syncing Garmin activities from {start_date} to {end_date}")
 
-            # Create the run record
-            run = ActualRun(
-                planned_workout_id=planned.id if planned else None,
-                garmin_activity_id=activity_id,
-                distance=round(distance, 2),
-                duration_seconds=duration,
-                pace=pace,
-                pace_seconds=pace_sec,
-                avg_hr=activity.get("averageHR"),
-                max_hr=activity.get("maxHR"),
-                elevation_gain=round(activity.get("elevationGain", 0) * 3.28084, 1) if activity.get("elevationGain") else None,
-                cadence=activity.get("averageRunningCadenceInStepsPerMinute"),
-                calories=activity.get("calories"),
-                start_lat=activity.get("startLatitude"),
-                start_lon=activity.get("startLongitude"),
-                started_at=self._parse_datetime(activity.get("startTimeLocal")),
-                raw_data=activity,
+        if activities is None:
+            activities = await self.fetch_running_activities(start_date, end_date)
+        else:
+            activities = [
+                a for a in activities
+                if start_date <= (self._parse_date(a.get("startTimeLocal")) or start_date) <= end_date
+            ]
+        if progress:
+            progress.update(activities_fetched=len(activities))
+
+        def ingest():
+            synced = self._ingest_activities(db, plan_id, activities, start_date, end_date)
+            if plan:
+                advance_cursor(db, plan_id, "activities", start_date, end_date)
+                db.commit()
+            return synced
+
+        synced = await _in_thread(ingest)
+        if progress:
+            progress.update(
+                activities_synced=len(synced),
+                activities_matched=sum(1 for s in synced if s["matched"]),
             )
 
-            db.add(run)
-            db.commit()
-            db.refresh(run)
+        # Mile splits and per-second streams for the runs this sync inserted
+        await self.sync_run_splits(db, plan_id, [s["id"] for s in synced], progress)
+        await self.sync_run_streams(db, [s["id"] for s in synced], progress)
 
-            # Fetch weather for this run
-            await self._fetch_weather_for_run(db, run)
+        # Weather for runs since the weather cursor, including earlier failures
+        def weather_runs():
+            weather_start = sync_start(db, plan, "weather", mode, requested_start) if plan else start_date
+            return weather_start, self._runs_needing_weather(db, weather_start, end_date)
 
-            synced.append({
-                "id": run.id,
-                "date": activity_date.isoformat() if activity_date else None,
-                "distance": run.distance,
-                "pace": run.pace,
-                "matched": planned.id if planned else None,
-            })
+        weather_start, runs = await _in_thread(weather_runs)
+        failed = await self._fetch_weather_for_runs(db, runs, progress)
+        if plan:
+            # Stop the cursor short of the earliest failure so it is retried next time
+            failed_dates = [run["started_at"].date() for run in failed]
+            through = min(failed_dates) - timedelta(days=1) if failed_dates else end_date
+
+            def advance_weather():
+                advance_cursor(db, plan_id, "weather", weather_start, through)
+                db.commit()
 
-            print(f"Synced: {run.distance}mi on {activity_date} -> {'matched to workout' if planned else 'unmatched'}")
+            await _in_thread(advance_weather)
 
-        # Also sync sleep data for these dates
-        await self.sync_sleep_data(db, plan_id, start_date, end_date)
+        # Also sync sleep and HRV, each from its own cursor
+        await self.sync_sleep_data(db, plan_id, requested_start, end_date, progress, mode)
 
         return synced
 
@@ -168,71 +224,479 @@ class GarminSyncService:
         self,
         db: Session,
         plan_id: int,
-        start_date: date,
+        start_date: Optional[date],
         end_date: date,
+        progress=None,
+        mode: str = "incremental",
     ):
-        """Sync sleep and HRV data from Garmin for workouts in date range."""
+        """Sync sleep and HRV data from Garmin for workouts up to ``end_date``.
+
+        Without a ``start_date``, each metric starts from its own cursor
+        (minus the overlap) in ``incremental`` mode, or from the plan start
+        in ``full`` mode.
+        """
         if not self.client:
             return
 
-        # Get all workouts in the date range that don't have sleep or HRV data
-        workouts = (
-            db.query(PlannedWorkout)
-            .filter(PlannedWorkout.plan_id == plan_id)
-            .filter(PlannedWorkout.date >= start_date)
-            .filter(PlannedWorkout.date <= end_date)
-            .filter(
-                (PlannedWorkout.sleep_hours.is_(None)) | (PlannedWorkout.hrv.is_(None))
+        def pending_workouts():
+            plan = db.get(TrainingPlan, plan_id)
+            if plan is None:
+                return None
+            sleep_since = sync_start(db, plan, "sleep", mode, start_date)
+            hrv_since = sync_start(db, plan, "hrv", mode, start_date)
+
+            # Get all workouts in the date range that don't have sleep or HRV data
+            workouts = (
+                db.query(PlannedWorkout.id, PlannedWorkout.date, PlannedWorkout.sleep_hours, PlannedWorkout.hrv)
+                .filter(PlannedWorkout.plan_id == plan_id)
+                .filter(PlannedWorkout.date >= min(sleep_since, hrv_since))
+                .filter(PlannedWorkout.date <= end_date)
+                .filter(
+                    (PlannedWorkout.sleep_hours.is_(None)) | (PlannedWorkout.hrv.is_(None))
+                )
+                .all()
             )
-            .all()
-        )
+            return sleep_since, hrv_since, workouts
+
+        pending = await _in_thread(pending_workouts)
+        if pending is None:
+            return
+        sleep_since, hrv_since, workouts = pending
 
         print(f"Fetching sleep/HRV data for {len(workouts)} workouts")
 
-        for workout in workouts:
-            # Fetch sleep data if missing
-            if workout.sleep_hours is None:
+        # One request per date and metric, fetched concurrently
+        sleep_dates = sorted({
+            w.date for w in workouts
+            if w.sleep_hours is None and (sleep_since is None or w.date >= sleep_since)
+        })
+        hrv_dates = sorted({
+            w.date for w in workouts
+            if w.hrv is None and (hrv_since is None or w.date >= hrv_since)
+        })
+
+        limiter = TokenBucket(rate=GARMIN_RATE_PER_SECOND, capacity=GARMIN_RATE_BURST)
+        semaphore = asyncio.Semaphore(self.api.max_workers)
+        failed: Dict[str, List[date]] = {"sleep": [], "HRV": []}
+
+        async def fetch(label: str, call, workout_date: date):
+            async with semaphore:
                 try:
-                    sleep_data = self.client.get_sleep_data(workout.date.isoformat())
-                    if sleep_data and sleep_data.get("dailySleepDTO"):
-                        daily = sleep_data["dailySleepDTO"]
-                        sleep_seconds = daily.get("sleepTimeSeconds", 0)
-                        if sleep_seconds > 0:
-                            workout.sleep_hours = round(sleep_seconds / 3600, 1)
-                            print(f"Sleep for {workout.date}: {workout.sleep_hours}h")
+                    return await retry_with_backoff(
+                        lambda: self._rate_limited(limiter, call, workout_date.isoformat()),
+                        retry_on=RETRYABLE_ERRORS,
+                    )
                 except Exception as e:
-                    print(f"Failed to get sleep for {workout.date}: {e}")
+                    print(f"Failed to get {label} for {workout_date}: {e}")
+                    failed[label].append(workout_date)
+                    if progress:
+                        progress.add_error(f"Failed to get {label} for {workout_date}: {e}")
+                    return None
+
+        results = await asyncio.gather(
+            *(fetch("sleep", self.api.get_sleep_data, d) for d in sleep_dates),
+            *(fetch("HRV", self.api.get_hrv_data, d) for d in hrv_dates),
+        )
+        sleep_results, hrv_results = results[:len(sleep_dates)], results[len(sleep_dates):]
+
+        sleep_by_date = {}
+        for workout_date, sleep_data in zip(sleep_dates, sleep_results):
+            if sleep_data and sleep_data.get("dailySleepDTO"):
+                daily = sleep_data["dailySleepDTO"]
+                sleep_seconds = daily.get("sleepTimeSeconds") or 0
+                if sleep_seconds > 0:
+                    sleep_by_date[workout_date] = round(sleep_seconds / 3600, 1)
+                    print(f"Sleep for {workout_date}: {sleep_by_date[workout_date]}h")
+
+        hrv_by_date = {}
+        for workout_date, hrv_data in zip(hrv_dates, hrv_results):
+            if hrv_data and hrv_data.get("hrvSummary"):
+                last_night_avg = hrv_data["hrvSummary"].get("lastNightAvg")
+                if last_night_avg:
+                    hrv_by_date[workout_date] = int(last_night_avg)
+                    print(f"HRV for {workout_date}: {hrv_by_date[workout_date]}ms")
+
+        # Write everything back in one batched UPDATE
+        updates = []
+        for workout in workouts:
+            values = {"id": workout.id}
+            if workout.sleep_hours is None and workout.date in sleep_by_date:
+                values["sleep_hours"] = sleep_by_date[workout.date]
+            if workout.hrv is None and workout.date in hrv_by_date:
+                values["hrv"] = hrv_by_date[workout.date]
+            if len(values) > 1:
+                updates.append(values)
+
+        def store():
+            if updates:
+                db.execute(update(PlannedWorkout), updates)
+                mark_plans_changed(db, [plan_id])
+                record_changes(db, "workouts", [u["id"] for u in updates])
+
+            # Advance cursors, stopping short of the earliest failed date
+            for data_type, label, since in (("sleep", "sleep", sleep_since), ("hrv", "HRV", hrv_since)):
+                through = min(failed[label]) - timedelta(days=1) if failed[label] else end_date
+                advance_cursor(db, plan_id, data_type, since, through)
+            db.commit()
+
+        await _in_thread(store)
+
+    async def sync_run_splits(self, db: Session, plan_id: int, run_ids: List[int], progress=None) -> int:
+        """Fetch lap data for runs, convert it to mile splits and bulk insert them.
+
+        Runs that already have splits are skipped. Returns the number of
+        splits stored.
+        """
+        if not self.client or not run_ids:
+            return 0
+
+        runs = await _in_thread(lambda: (
+            db.query(ActualRun.id, ActualRun.garmin_activity_id)
+            .filter(ActualRun.id.in_(run_ids))
+            .filter(ActualRun.garmin_activity_id.isnot(None))
+            .filter(~ActualRun.splits.any())
+            .all()
+        ))
+        print(f"Fetching splits for {len(runs)} runs")
+        results = await self._fetch_for_runs("splits", self.api.get_activity_splits, runs, progress)
+
+        rows = []
+        for run, data in zip(runs, results):
+            if data:
+                rows.extend({"run_id": run.id, **split} for split in laps_to_mile_splits(data.get("lapDTOs") or []))
+        if not rows:
+            return 0
+
+        def store():
+            # One multi-row INSERT per batch for every run's splits
+            split_ids = []
+            for i in range(0, len(rows), INSERT_BATCH_SIZE):
+                split_ids.extend(db.scalars(
+                    insert(RunSplit).values(rows[i:i + INSERT_BATCH_SIZE]).returning(RunSplit.id)
+                ))
+            record_changes(db, "splits", split_ids)
+            mark_plans_changed(db, [plan_id])
+            db.commit()
+
+        await _in_thread(store)
 
-            # Fetch HRV data if missing
-            if workout.hrv is None:
+        if progress:
+            progress.update(splits_imported=len(rows))
+        print(f"Stored {len(rows)} splits")
+        return len(rows)
+
+    async def sync_run_streams(self, db: Session, run_ids: List[int], progress=None) -> int:
+        """Fetch per-second samples for runs and store them as compressed streams.
+
+        Runs that already have a stream are skipped. Returns the number of
+        streams stored.
+        """
+        if not self.client or not run_ids or not SYNC_RUN_STREAMS:
+            return 0
+
+        runs = await _in_thread(lambda: (
+            db.query(ActualRun.id, ActualRun.garmin_activity_id)
+            .outerjoin(RunStream)
+            .filter(ActualRun.id.in_(run_ids))
+            .filter(ActualRun.garmin_activity_id.isnot(None))
+            .filter(RunStream.run_id.is_(None))
+            .all()
+        ))
+        print(f"Fetching streams for {len(runs)} runs")
+        results = await self._fetch_for_runs("stream", self.api.get_activity_details, runs, progress)
+
+        def store():
+            streams, skipped = {}, []
+            for run, details in zip(runs, results):
+                samples = self._details_to_samples(details) if details else None
+                if not samples:
+                    continue
+                try:
+                    streams[run.id] = build_stream(run.id, samples)
+                except InvalidStream as e:
+                    # A sensor glitch in one run must not cost the rest of the batch
+                    print(f"Skipping stream for run {run.id}: {e}")
+                    skipped.append(f"Skipped stream for run {run.id}: {e}")
+            if streams:
+                write_streams(db, streams, batch_size=INSERT_BATCH_SIZE)
+                db.commit()
+            return streams, skipped
+
+        # Encoding and writing happen off the event loop; progress is reported back on it
+        streams, skipped = await _in_thread(store)
+        if progress:
+            for message in skipped:
+                progress.add_error(message)
+        if not streams:
+            return 0
+
+        if progress:
+            progress.update(streams_imported=len(streams))
+        print(f"Stored {len(streams)} streams")
+        return len(streams)
+
+    async def _fetch_for_runs(self, label: str, call, runs: List[Any], progress=None) -> List[Optional[Any]]:
+        """Call a per-activity Garmin endpoint for each run, concurrently and rate limited.
+
+        Results are in the order of ``runs`` (rows with ``id`` and
+        ``garmin_activity_id``); failed calls give None and are reported.
+        """
+        limiter = TokenBucket(rate=GARMIN_RATE_PER_SECOND, capacity=GARMIN_RATE_BURST)
+        semaphore = asyncio.Semaphore(self.api.max_workers)
+
+        async def fetch(run_id: int, activity_id: str):
+            async with semaphore:
                 try:
-                    hrv_data = self.client.get_hrv_data(workout.date.isoformat())
-                    if hrv_data and hrv_data.get("hrvSummary"):
-                        summary = hrv_data["hrvSummary"]
-                        last_night_avg = summary.get("lastNightAvg")
-                        if last_night_avg:
-                            workout.hrv = int(last_night_avg)
-                            print(f"HRV for {workout.date}: {workout.hrv}ms")
+                    return await retry_with_backoff(
+                        lambda: self._rate_limited(limiter, call, activity_id),
+                        retry_on=RETRYABLE_ERRORS,
+                    )
                 except Exception as e:
-                    print(f"Failed to get HRV for {workout.date}: {e}")
+                    print(f"Failed to get {label} for run {run_id}: {e}")
+                    if progress:
+                        progress.add_error(f"Failed to get {label} for run {run_id}: {e}")
+                    return None
+
+        return await asyncio.gather(*(fetch(run.id, run.garmin_activity_id) for run in runs))
+
+    def _details_to_samples(self, details: Dict[str, Any]) -> Optional[Dict[str, List[Optional[float]]]]:
+        """Convert Garmin activity details (chart metrics) into stream channels."""
+        index = {d["key"]: d["metricsIndex"] for d in details.get("metricDescriptors") or []}
+        rows = [m.get("metrics") or [] for m in details.get("activityDetailMetrics") or []]
+        if "sumDuration" not in index or not rows:
+            return None
 
-            db.commit()
+        def column(key: str) -> Optional[List[Optional[float]]]:
+            i = index.get(key)
+            if i is None:
+                return None
+            return [row[i] if i < len(row) else None for row in rows]
+
+        samples: Dict[str, Optional[List[Optional[float]]]] = {
+            "t": [round(v) if v is not None else None for v in column("sumDuration")],
+            "hr": column("directHeartRate"),
+            "cadence": column("directDoubleCadence") or column("directRunCadence"),
+            "elevation": column("directElevation"),
+            "lat": column("directLatitude"),
+            "lon": column("directLongitude"),
+        }
+        speed = column("directSpeed")  # m/s
+        if speed is not None:
+            # Standing still has no meaningful pace
+            samples["pace"] = [round(1609.344 / s) if s and s > 0.5 else None for s in speed]
+
+        # Keep the first sample of each second, dropping samples without a time
+        keep, previous = [], None
+        for i, t in enumerate(samples["t"]):
+            if t is not None and (previous is None or t > previous):
+                keep.append(i)
+                previous = t
+        if not keep:
+            return None
+        return {
+            channel: [values[i] for i in keep]
+            for channel, values in samples.items()
+            if values is not None
+        }
+
+    async def _rate_limited(self, limiter: TokenBucket, call, *args):
+        """Wait for a rate limit token, then make the Garmin call."""
+        await limiter.acquire()
+        return await call(*args)
+
+    def _ingest_activities(
+        self,
+        db: Session,
+        plan_id: int,
+        activities: List[Dict[str, Any]],
+        start_date: date,
+        end_date: date,
+    ) -> List[Dict[str, Any]]:
+        """Insert new activities as runs with one prefetch per lookup and bulk upserts."""
+        activity_ids = list({str(a.get("activityId")) for a in activities})
+
+        # Activity IDs that are already stored
+        known_ids = {
+            garmin_id
+            for (garmin_id,) in db.query(ActualRun.garmin_activity_id)
+            .filter(ActualRun.garmin_activity_id.in_(activity_ids))
+        }
+
+        # Plan workouts in the sync window by date, and whether each already has a run
+        workouts_by_date: Dict[date, tuple] = {}
+        for workout_id, workout_date, run_id in (
+            db.query(PlannedWorkout.id, PlannedWorkout.date, ActualRun.id)
+            .outerjoin(ActualRun, ActualRun.planned_workout_id == PlannedWorkout.id)
+            .filter(PlannedWorkout.plan_id == plan_id)
+            .filter(PlannedWorkout.date >= start_date)
+            .filter(PlannedWorkout.date <= end_date)
+            .filter(PlannedWorkout.workout_type.notin_(NON_RUN_TYPES))
+            .order_by(PlannedWorkout.id)
+        ):
+            workouts_by_date.setdefault(workout_date, (workout_id, run_id is not None))
+
+        rows = []
+        raw_by_id: Dict[str, Dict[str, Any]] = {}
+        claimed_workouts = set()
+        for activity in activities:
+            activity_id = str(activity.get("activityId"))
 
-    async def _fetch_weather_for_run(self, db: Session, run: ActualRun):
-        """Fetch and store weather data for a run."""
-        if not run.start_lat or not run.start_lon or not run.started_at:
-            print(f"Run {run.id} missing location/time data, skipping weather")
-            return
+            # Skip if already synced
+            if activity_id in known_ids:
+                print(f"Activity {activity_id} already synced, skipping")
+                continue
+            known_ids.add(activity_id)
 
-        try:
-            weather_data = await self.weather_service.get_historical_weather(
-                lat=run.start_lat,
-                lon=run.start_lon,
-                dt=run.started_at,
+            # Parse the activity date
+            activity_date = self._parse_date(activity.get("startTimeLocal"))
+
+            # Find matching planned workout by date
+            planned_id = None
+            if activity_date and activity_date in workouts_by_date:
+                workout_id, has_run = workouts_by_date[activity_date]
+
+                # If workout already has a run, skip
+                if has_run or workout_id in claimed_workouts:
+                    print(f"Workout on {activity_date} already has a run, skipping")
+                    continue
+                planned_id = workout_id
+                claimed_workouts.add(workout_id)
+
+            rows.append(self._activity_to_row(activity, activity_id, planned_id))
+            raw_by_id[activity_id] = activity
+
+        synced = []
+        for i in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[i:i + INSERT_BATCH_SIZE]
+            stmt = (
+                dialect_insert(db, ActualRun)
+                .values(batch)
+                .on_conflict_do_nothing()
+                .returning(ActualRun.id, ActualRun.garmin_activity_id)
             )
+            inserted = {garmin_id: run_id for run_id, garmin_id in db.execute(stmt)}
+
+            record_changes(db, "runs", inserted.values())
+
+            # Raw payloads go to their own compressed table
+            if inserted:
+                db.execute(insert(RunRawData).values([
+                    {"run_id": run_id, **RunRawData.pack(raw_by_id[garmin_id])}
+                    for garmin_id, run_id in inserted.items()
+                ]))
 
-            weather = RunWeather(
-                run_id=run.id,
+            for row in batch:
+                run_id = inserted.get(row["garmin_activity_id"])
+                if run_id is None:
+                    # Inserted concurrently by another sync
+                    continue
+                run_date = row["started_at"].date() if row["started_at"] else None
+                synced.append({
+                    "id": run_id,
+                    "date": run_date.isoformat() if run_date else None,
+                    "distance": row["distance"],
+                    "pace": row["pace"],
+                    "matched": row["planned_workout_id"],
+                })
+                print(f"Synced: {row['distance']}mi on {run_date} -> {'matched to workout' if row['planned_workout_id'] else 'unmatched'}")
+
+        # Update the plan's weekly rollups for newly matched workouts
+        matched = [s["matched"] for s in synced if s["matched"]]
+        refresh_stats_for_workouts(db, matched)
+        if matched:
+            mark_plans_changed(db, [plan_id])
+
+        # Training load only needs recomputing from the earliest new run on
+        run_dates = [s["date"] for s in synced if s["date"]]
+        if run_dates:
+            refresh_training_load(db, date.fromisoformat(min(run_dates)))
+        db.commit()
+        return synced
+
+    def _activity_to_row(
+        self,
+        activity: Dict[str, Any],
+        activity_id: str,
+        planned_id: Optional[int],
+    ) -> Dict[str, Any]:
+        """Convert a Garmin activity summary into actual_runs column values."""
+        distance = (activity.get("distance") or 0) / 1609.344  # meters to miles
+        duration = int(activity.get("duration") or 0)  # seconds
+
+        # Calculate pace
+        if distance > 0:
+            pace_sec = int(duration / distance)
+            pace = f"{pace_sec // 60}:{pace_sec % 60:02d}/mi"
+        else:
+            pace_sec = 0
+            pace = "0:00/mi"
+
+        return {
+            "planned_workout_id": planned_id,
+            "garmin_activity_id": activity_id,
+            "distance": round(distance, 2),
+            "duration_seconds": duration,
+            "pace": pace,
+            "pace_seconds": pace_sec,
+            "avg_hr": activity.get("averageHR"),
+            "max_hr": activity.get("maxHR"),
+            # Every row needs the same keys for the multi-row INSERT
+            **{
+                f"hr_zone{n}_seconds": (
+                    int(activity[f"hrTimeInZone_{n}"]) if activity.get(f"hrTimeInZone_{n}") is not None else None
+                )
+                for n in range(1, HR_ZONE_COUNT + 1)
+            },
+            "elevation_gain": round(activity.get("elevationGain", 0) * 3.28084, 1) if activity.get("elevationGain") else None,
+            "cadence": activity.get("averageRunningCadenceInStepsPerMinute"),
+            "calories": activity.get("calories"),
+            "start_lat": activity.get("startLatitude"),
+            "start_lon": activity.get("startLongitude"),
+            "started_at": self._parse_datetime(activity.get("startTimeLocal")),
+        }
+
+    def _runs_needing_weather(self, db: Session, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """Garmin runs in the date range that have a location but no weather yet.
+
+        Plain rows, so they stay usable on the event loop after later commits.
+        """
+        rows = (
+            db.query(ActualRun.id, ActualRun.start_lat, ActualRun.start_lon, ActualRun.started_at)
+            .outerjoin(RunWeather)
+            .filter(ActualRun.garmin_activity_id.isnot(None))
+            .filter(RunWeather.id.is_(None))
+            .filter(ActualRun.start_lat.isnot(None))
+            .filter(ActualRun.started_at >= datetime.combine(start_date, datetime.min.time()))
+            .filter(ActualRun.started_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+            .all()
+        )
+        return [row._asdict() for row in rows]
+
+    async def _fetch_weather_for_runs(self, db: Session, runs: List[Dict[str, Any]], progress=None) -> List[Dict[str, Any]]:
+        """Fetch and store weather data for runs in one batched lookup.
+
+        ``runs`` are rows from ``_runs_needing_weather``. Returns the ones
+        whose weather could not be fetched.
+        """
+        runs = [run for run in runs if run["start_lat"] and run["start_lon"] and run["started_at"]]
+        if not runs:
+            return []
+
+        results = await self.weather_service.get_historical_weather_batch(
+            [(run["start_lat"], run["start_lon"], run["started_at"]) for run in runs],
+            db=db,
+        )
+
+        failed, rows = [], []
+        for run, weather_data in zip(runs, results):
+            if weather_data is None:
+                print(f"Failed to fetch weather for run {run['id']}")
+                failed.append(run)
+                if progress:
+                    progress.add_error(f"Failed to fetch weather for run {run['id']}")
+                continue
+            rows.append(RunWeather(
+                run_id=run["id"],
                 temperature=weather_data.get("temperature"),
                 feels_like=weather_data.get("feels_like"),
                 humidity=weather_data.get("humidity"),
@@ -240,14 +704,17 @@ class GarminSyncService:
                 wind_direction=weather_data.get("wind_direction"),
                 conditions=weather_data.get("conditions"),
                 precipitation=weather_data.get("precipitation"),
-            )
+            ))
+            print(f"Weather for run {run['id']}: {weather_data.get('temperature')}°F, {weather_data.get('conditions')}")
 
-            db.add(weather)
+        def store():
+            db.add_all(rows)
             db.commit()
-            print(f"Weather for run {run.id}: {weather.temperature}°F, {weather.conditions}")
 
-        except Exception as e:
-            print(f"Failed to fetch weather for run {run.id}: {e}")
+        await _in_thread(store)
+        if progress and rows:
+            progress.update(weather_enriched=len(rows))
+        return failed
 
     def _parse_date(self, date_str) -> Optional[date]:
         """Parse date from Garmin format."""
@@ -0,0 +1,124 @@
+"""Tracks which training plans a session's writes touch.
+
+Mapper events on the plan's tables record the plans, workouts and runs
+written in a flush. After the flush they are resolved to plan IDs and each
+plan's ``version`` is bumped in the same transaction. Once the session
+commits, the plan IDs are passed to the ``on_plans_committed`` listeners
+(response cache invalidation). Bulk ``insert()``/``update()`` statements
+bypass mapper events; callers using them must call ``mark_plans_changed``.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.models import (
+    TrainingPlan,
+    PlannedWorkout,
+    ActualRun,
+    RunSplit,
+    RunWeather,
+    RunNote,
+    PlanWeekStats,
+)
+
+# session.info keys for changes waiting on flush / commit
+PENDING_KEY = "plan_changes_pending"
+CHANGED_KEY = "plan_changes_committing"
+
+_commit_listeners: List[Callable[[Set[int]], None]] = []
+
+
+def on_plans_committed(listener: Callable[[Set[int]], None]):
+    """Register a callback run with the changed plan IDs after each commit."""
+    _commit_listeners.append(listener)
+    return listener
+
+
+def mark_plans_changed(db: Session, plan_ids: Iterable[int]):
+    """Record a bulk write to these plans in the session's transaction."""
+    _record_changed(db, {p for p in plan_ids if p is not None})
+
+
+async def get_plan_version(db: AsyncSession, plan_id: int) -> Optional[int]:
+    """Current version of a plan, or None if it doesn't exist."""
+    return await db.scalar(select(TrainingPlan.version).filter(TrainingPlan.id == plan_id))
+
+
+def _record_changed(session: Session, plan_ids: Set[int]):
+    if not plan_ids:
+        return
+    session.execute(
+        update(TrainingPlan)
+        .where(TrainingPlan.id.in_(plan_ids))
+        .values(version=TrainingPlan.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    session.info.setdefault(CHANGED_KEY, set()).update(plan_ids)
+
+
+def _pending(session: Session) -> Dict[str, Set[int]]:
+    return session.info.setdefault(PENDING_KEY, {"plans": set(), "workouts": set(), "runs": set()})
+
+
+def _current_and_previous(target, attr: str) -> List[Any]:
+    """The attribute's value plus any value it had before this flush."""
+    history = inspect(target).attrs[attr].history
+    return [getattr(target, attr), *history.deleted]
+
+
+def _listen(model, collect: Callable[[Any, Dict[str, Set[int]]], None]):
+    def handler(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            collect(target, _pending(session))
+
+    for name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, name, handler)
+
+
+_listen(TrainingPlan, lambda t, p: p["plans"].add(t.id))
+_listen(PlanWeekStats, lambda t, p: p["plans"].update(_current_and_previous(t, "plan_id")))
+_listen(PlannedWorkout, lambda t, p: p["plans"].update(_current_and_previous(t, "plan_id")))
+_listen(ActualRun, lambda t, p: p["workouts"].update(_current_and_previous(t, "planned_workout_id")))
+_listen(RunNote, lambda t, p: p["workouts"].update(_current_and_previous(t, "planned_workout_id")))
+_listen(RunSplit, lambda t, p: p["runs"].add(t.run_id))
+_listen(RunWeather, lambda t, p: p["runs"].add(t.run_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _resolve_pending(session, flush_context):
+    """Turn the rows written by this flush into changed plan IDs."""
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+
+    plan_ids = {p for p in pending["plans"] if p is not None}
+    workout_ids = {w for w in pending["workouts"] if w is not None}
+    run_ids = {r for r in pending["runs"] if r is not None}
+    if run_ids:
+        workout_ids |= set(session.execute(
+            select(ActualRun.planned_workout_id)
+            .filter(ActualRun.id.in_(run_ids), ActualRun.planned_workout_id.isnot(None))
+        ).scalars())
+    if workout_ids:
+        plan_ids |= set(session.execute(
+            select(PlannedWorkout.plan_id).filter(PlannedWorkout.id.in_(workout_ids))
+        ).scalars())
+
+    _record_changed(session, plan_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed(session):
+    plan_ids = session.info.pop(CHANGED_KEY, None)
+    if plan_ids:
+        for listener in _commit_listeners:
+            listener(plan_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(CHANGED_KEY, None)
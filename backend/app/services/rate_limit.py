@@ -0,0 +1,47 @@
+"""Rate limiting and retry helpers for outbound API calls."""
+from typing import Awaitable, Callable, Tuple, Type, TypeVar
+import asyncio
+import random
+import time
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Async token bucket allowing ``rate`` calls per second with bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def retry_with_backoff(
+    func: Callable[[], Awaitable[T]],
+    retry_on: Tuple[Type[BaseException], ...],
+    attempts: int = 3,
+    base_delay: float = 1.0,
+) -> T:
+    """Call ``func`` and retry on the given errors with jittered exponential backoff."""
+    for attempt in range(attempts):
+        try:
+            return await func()
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            delay = base_delay * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
@@ -0,0 +1,227 @@
+"""Response cache for per-plan read endpoints, invalidated by ORM writes.
+
+Cached bodies are tagged with the plans they depend on, and the tags are
+invalidated once a session that changed those plans commits (see
+``app.services.plan_changes``).
+
+Writes from other processes (cron sync, scripts) are not seen by the
+in-memory backend, so entries also expire after ``RESPONSE_CACHE_TTL_SECONDS``.
+Plug in a shared backend with ``response_cache.backend = ...`` to avoid that.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+import json
+import os
+import threading
+import time
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.services.plan_changes import on_plans_committed
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+
+def plan_tag(plan_id: int) -> str:
+    return f"plan:{plan_id}"
+
+
+def plan_etag(plan_id: int, version: int, day: Optional[date] = None) -> str:
+    """Strong ETag for a plan's responses at a given version (and day, for date-dependent ones)."""
+    if day is not None:
+        return f'"plan-{plan_id}-v{version}-{day.isoformat()}"'
+    return f'"plan-{plan_id}-v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+class CacheBackend(ABC):
+    """Storage for cached response bodies. Subclass to share the cache between processes.
+
+    Methods may be called from the event loop and from threadpool workers
+    (sync routes invalidate after commit), so implementations must be thread-safe.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, body: bytes, tags: Iterable[str]):
+        ...
+
+    @abstractmethod
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying any of the tags. Returns the number dropped."""
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[bytes, float, Tuple[str, ...]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            body, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, tags: Iterable[str]):
+        tags = tuple(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (body, time.monotonic() + self.ttl, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._keys_by_tag.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _remove(self, key: str):
+        # Caller holds self._lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """Caches serialized JSON responses keyed by route, query params and day."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        # Bumped on every invalidation; a body built across one is not stored
+        self._generation = 0
+
+    async def respond(
+        self,
+        request: Request,
+        tags: Iterable[str],
+        build: Callable[[], Awaitable[Any]],
+        etag: Optional[str] = None,
+    ) -> Response:
+        """Return the cached body for this request, or build, store and return it.
+
+        ``build`` returns a Pydantic model or anything ``jsonable_encoder``
+        accepts. Exceptions it raises (e.g. 404s) are not cached. With an
+        ``etag``, the body is cached per ETag, the header is sent, and a
+        matching If-None-Match gets an empty 304.
+        """
+        headers = {}
+        if etag is not None:
+            # Let browsers store the body but revalidate it on every use
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                self.not_modified += 1
+                return Response(status_code=304, headers=headers)
+
+        key = self._key(request, etag)
+        body = self.backend.get(key)
+        if body is not None:
+            self.hits += 1
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        self.misses += 1
+        generation = self._generation
+        body = _serialize(await build())
+        if generation == self._generation:
+            self.backend.set(key, body, tags)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self, tags: Iterable[str]):
+        tags = list(tags)
+        if not tags:
+            return
+        self._generation += 1
+        self.invalidations += self.backend.invalidate(tags)
+
+    def clear(self):
+        self._generation += 1
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+        }
+
+    @staticmethod
+    def _key(request: Request, etag: Optional[str] = None) -> str:
+        # Summary and countdown depend on today's date
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}#{date.today().isoformat()}#{etag or ''}"
+
+
+def _serialize(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    return json.dumps(jsonable_encoder(content)).encode("utf-8")
+
+
+response_cache = ResponseCache(MemoryCacheBackend())
+
+
+@on_plans_committed
+def _invalidate_committed(plan_ids: Set[int]):
+    response_cache.invalidate(plan_tag(p) for p in plan_ids)
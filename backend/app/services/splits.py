@@ -0,0 +1,102 @@
+"""Conversion of Garmin laps into mile splits."""
+from typing import Any, Dict, List
+
+METERS_PER_MILE = 1609.344
+
+# A trailing partial split shorter than this (in miles) is dropped
+MIN_PARTIAL_SPLIT_MILES = 0.05
+
+
+def _format_pace(pace_seconds: int) -> str:
+    return f"{pace_seconds // 60}:{pace_seconds % 60:02d}/mi"
+
+
+class _SplitAccumulator:
+    """Running totals for the mile split being assembled."""
+
+    def __init__(self):
+        self.meters = 0.0
+        self.seconds = 0.0
+        self.hr_seconds = 0.0  # seconds with HR, weighting avg_hr
+        self.hr_total = 0.0
+        self.cadence_seconds = 0.0
+        self.cadence_total = 0.0
+        self.elevation_meters = 0.0
+        self.has_elevation = False
+
+    def add(self, lap: Dict[str, Any], fraction: float):
+        seconds = lap["duration"] * fraction
+        self.meters += lap["distance"] * fraction
+        self.seconds += seconds
+        if lap.get("averageHR"):
+            self.hr_total += lap["averageHR"] * seconds
+            self.hr_seconds += seconds
+        if lap.get("averageRunCadence"):
+            self.cadence_total += lap["averageRunCadence"] * seconds
+            self.cadence_seconds += seconds
+        if lap.get("elevationGain") is not None:
+            self.elevation_meters += lap["elevationGain"] * fraction
+            self.has_elevation = True
+
+    def merge(self, other: "_SplitAccumulator"):
+        self.meters += other.meters
+        self.seconds += other.seconds
+        self.hr_seconds += other.hr_seconds
+        self.hr_total += other.hr_total
+        self.cadence_seconds += other.cadence_seconds
+        self.cadence_total += other.cadence_total
+        self.elevation_meters += other.elevation_meters
+        self.has_elevation = self.has_elevation or other.has_elevation
+
+    def to_split(self, split_number: int) -> Dict[str, Any]:
+        miles = self.meters / METERS_PER_MILE
+        pace_seconds = round(self.seconds / miles)
+        return {
+            "split_number": split_number,
+            "distance": round(miles, 2),
+            "duration_seconds": round(self.seconds),
+            "pace": _format_pace(pace_seconds),
+            "pace_seconds": pace_seconds,
+            "avg_hr": round(self.hr_total / self.hr_seconds) if self.hr_seconds else None,
+            "elevation_gain": round(self.elevation_meters * 3.28084, 1) if self.has_elevation else None,
+            "cadence": round(self.cadence_total / self.cadence_seconds) if self.cadence_seconds else None,
+        }
+
+
+def laps_to_mile_splits(laps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Re-cut Garmin laps (``lapDTOs``) into mile splits as run_splits column values.
+
+    Each lap is treated as run at an even pace, so a lap crossing a mile
+    boundary is divided in proportion to distance. HR and cadence are
+    time-weighted averages; elevation gain is shared by distance. Laps
+    without distance (auto-pause, standing) add their time to the split in
+    progress, so split durations add up to the laps'. A final partial mile
+    is kept as a shorter split, or folded into the last split when shorter
+    than ``MIN_PARTIAL_SPLIT_MILES``.
+    """
+    splits: List[Dict[str, Any]] = []
+    current = _SplitAccumulator()
+    last = None  # accumulator of the most recent full split
+
+    for lap in laps:
+        if not lap.get("duration"):
+            continue
+        if not lap.get("distance"):
+            current.add(lap, 1.0)
+            continue
+        remaining = 1.0  # fraction of the lap not yet assigned to a split
+        while remaining > 1e-9:
+            needed = (METERS_PER_MILE - current.meters) / lap["distance"]
+            fraction = min(remaining, needed)
+            current.add(lap, fraction)
+            remaining -= fraction
+            if current.meters >= METERS_PER_MILE - 1e-6:
+                splits.append(current.to_split(len(splits) + 1))
+                last, current = current, _SplitAccumulator()
+
+    if current.meters / METERS_PER_MILE >= MIN_PARTIAL_SPLIT_MILES:
+        splits.append(current.to_split(len(splits) + 1))
+    elif current.seconds and last is not None:
+        last.merge(current)
+        splits[-1] = last.to_split(len(splits))
+    return splits
@@ -0,0 +1,330 @@
+"""Plan aggregation queries shared by the stats endpoints."""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, cast, insert, literal, literal_column, select, Date
+from typing import List, Dict, Any, Iterable, Optional, Union
+from datetime import date, datetime, time, timedelta
+
+from app.models import TrainingPlan, PlannedWorkout, ActualRun, PlanWeekStats
+from app.models.run import HR_ZONE_COUNT
+from app.services.plan_changes import mark_plans_changed
+
+# Workout types that are not runs and don't count towards run totals
+NON_RUN_TYPES = ["Rest", "Mobility"]
+
+
+def compute_weekly_rollups(
+    db: Session,
+    plan_id: int,
+    weeks: Optional[Iterable[int]] = None,
+) -> List[Dict[str, Any]]:
+    """Aggregate planned vs actual totals for every week of a plan in one query.
+
+    Each planned workout has at most one actual run (``planned_workout_id`` is
+    unique), so the outer join never duplicates planned distance.
+    """
+    query = (
+        db.query(
+            PlannedWorkout.week,
+            func.count(PlannedWorkout.id),
+            func.sum(case((PlannedWorkout.workout_type.notin_(NON_RUN_TYPES), 1), else_=0)),
+            func.count(ActualRun.id),
+            func.sum(PlannedWorkout.target_distance),
+            func.sum(ActualRun.distance),
+        )
+        .outerjoin(ActualRun, ActualRun.planned_workout_id == PlannedWorkout.id)
+        .filter(PlannedWorkout.plan_id == plan_id)
+    )
+    if weeks is not None:
+        query = query.filter(PlannedWorkout.week.in_(list(weeks)))
+    rows = query.group_by(PlannedWorkout.week).order_by(PlannedWorkout.week).all()
+
+    return [
+        {
+            "week": week,
+            "total_workouts": total_workouts,
+            "run_workouts": run_workouts or 0,
+            "completed_runs": completed_runs,
+            "planned_miles": planned_miles or 0,
+            "actual_miles": actual_miles or 0,
+        }
+        for week, total_workouts, run_workouts, completed_runs, planned_miles, actual_miles in rows
+    ]
+
+
+def refresh_week_stats(db: Session, plan_id: int, weeks: Iterable[int]):
+    """Recompute the materialized rollups for the given weeks of a plan.
+
+    Only the affected weeks are re-aggregated, so the cost is bounded by the
+    size of a week rather than the plan's history. Does not commit.
+    """
+    weeks = set(weeks)
+    if not weeks:
+        return
+
+    # Session is created with autoflush disabled; make pending changes visible
+    db.flush()
+
+    fresh = {w["week"]: w for w in compute_weekly_rollups(db, plan_id, weeks)}
+    existing = {
+        row.week: row
+        for row in db.query(PlanWeekStats)
+        .filter(PlanWeekStats.plan_id == plan_id)
+        .filter(PlanWeekStats.week.in_(weeks))
+    }
+
+    for week in weeks:
+        row = existing.get(week)
+        values = fresh.get(week)
+        if values is None:
+            # Week no longer has any workouts
+            if row is not None:
+                db.delete(row)
+            continue
+        if row is None:
+            row = PlanWeekStats(plan_id=plan_id, week=week)
+            db.add(row)
+        row.total_workouts = values["total_workouts"]
+        row.run_workouts = values["run_workouts"]
+        row.completed_runs = values["completed_runs"]
+        row.planned_miles = values["planned_miles"]
+        row.actual_miles = values["actual_miles"]
+
+    db.flush()
+
+
+def refresh_stats_for_workouts(db: Session, workout_ids: Iterable[Optional[int]]):
+    """Recompute rollups for the plan weeks containing the given workouts. Does not commit."""
+    workout_ids = {w for w in workout_ids if w is not None}
+    if not workout_ids:
+        return
+
+    db.flush()
+    affected: Dict[int, set] = {}
+    for plan_id, week in (
+        db.query(PlannedWorkout.plan_id, PlannedWorkout.week)
+        .filter(PlannedWorkout.id.in_(workout_ids))
+        .distinct()
+    ):
+        affected.setdefault(plan_id, set()).add(week)
+
+    for plan_id, weeks in affected.items():
+        refresh_week_stats(db, plan_id, weeks)
+
+
+def rebuild_plan_stats(db: Session, plan_id: Optional[int] = None) -> int:
+    """Rebuild the materialized rollups from scratch for one plan or all plans.
+
+    Returns the number of week rows written. Does not commit.
+    """
+    query = db.query(TrainingPlan.id)
+    if plan_id is not None:
+        query = query.filter(TrainingPlan.id == plan_id)
+    plan_ids = [pid for (pid,) in query]
+
+    written = 0
+    for pid in plan_ids:
+        db.query(PlanWeekStats).filter(PlanWeekStats.plan_id == pid).delete(synchronize_session=False)
+        rows = [{"plan_id": pid, **values} for values in compute_weekly_rollups(db, pid)]
+        if rows:
+            # One executemany per plan rather than an ORM INSERT per week
+            db.execute(insert(PlanWeekStats), rows)
+            written += len(rows)
+    # Bulk statements bypass the mapper events that bump plan versions
+    mark_plans_changed(db, plan_ids)
+    db.flush()
+    return written
+
+
+def get_week_stats(db: Session, plan_id: int) -> List[PlanWeekStats]:
+    """Read a plan's materialized weekly rollups.
+
+    Read-only: a plan without stored rollups (e.g. rows written outside the
+    API before a rebuild) is aggregated on the fly, and the result is not
+    persisted. ``rebuild_plan_stats`` backfills them.
+    """
+    rows = (
+        db.query(PlanWeekStats)
+        .filter(PlanWeekStats.plan_id == plan_id)
+        .order_by(PlanWeekStats.week)
+        .all()
+    )
+    if rows:
+        return rows
+    # Transient objects, never added to the session
+    return [PlanWeekStats(plan_id=plan_id, **values) for values in compute_weekly_rollups(db, plan_id)]
+
+
+def plan_summary(plan: TrainingPlan, weeks: List[PlanWeekStats]) -> Dict[str, Any]:
+    """Overall totals and progress for a plan from its weekly rollups."""
+    total_workouts = sum(w.total_workouts for w in weeks)
+    run_workouts = sum(w.run_workouts for w in weeks)
+    completed_runs = sum(w.completed_runs for w in weeks)
+    total_planned = sum(w.planned_miles for w in weeks)
+    total_actual = sum(w.actual_miles for w in weeks)
+
+    # Days until race
+    days_until_race = (plan.race_date - date.today()).days
+
+    # Current week
+    if plan.start_date <= date.today():
+        days_since_start = (date.today() - plan.start_date).days
+        last_week = weeks[-1].week if weeks else 1
+        current_week = min((days_since_start // 7) + 1, last_week)
+    else:
+        current_week = 0
+
+    return {
+        "plan_name": plan.name,
+        "race_date": plan.race_date.isoformat(),
+        "days_until_race": days_until_race,
+        "current_week": current_week,
+        "total_workouts": total_workouts,
+        "run_workouts": run_workouts,
+        "completed_runs": completed_runs,
+        "completion_rate": round(completed_runs / run_workouts * 100, 1) if run_workouts > 0 else 0,
+        "total_planned_miles": round(total_planned, 1),
+        "total_actual_miles": round(total_actual, 1),
+        "miles_remaining": round(total_planned - total_actual, 1),
+    }
+
+
+def weekly_breakdown(weeks: List[PlanWeekStats]) -> List[Dict[str, Any]]:
+    """Planned vs actual mileage per week."""
+    return [
+        {
+            "week": w.week,
+            "planned_miles": round(w.planned_miles, 1),
+            "actual_miles": round(w.actual_miles, 1),
+            "total_runs": w.run_workouts,
+            "completed_runs": w.completed_runs,
+        }
+        for w in weeks
+    ]
+
+
+def race_countdown(plan: TrainingPlan) -> Dict[str, Any]:
+    """Time left until the plan's race."""
+    days_left = (plan.race_date - date.today()).days
+    return {
+        "race_date": plan.race_date.isoformat(),
+        "race_name": plan.name,
+        "days_left": days_left,
+        "weeks_left": days_left // 7,
+        "days_remainder": days_left % 7,
+        "target_pace": plan.target_pace,
+        "target_time": plan.target_time,
+    }
+
+
+# hr_zone_totals group_by value -> grouping column
+HR_ZONE_GROUPS = {
+    "week": PlannedWorkout.week,
+    "workout_type": PlannedWorkout.workout_type,
+}
+
+
+def hr_zone_totals(
+    db: Session,
+    plan_id: int,
+    group_by: Optional[str] = None,
+) -> Union[Dict[str, int], List[Dict[str, Any]]]:
+    """Seconds spent in each HR zone across the plan's runs, summed in SQL.
+
+    With ``group_by`` ("week" or "workout_type"), returns one row per group.
+    """
+    zone_names = [f"zone{n}" for n in range(1, HR_ZONE_COUNT + 1)]
+    sums = [
+        func.coalesce(func.sum(getattr(ActualRun, f"hr_zone{n}_seconds")), 0).label(name)
+        for n, name in enumerate(zone_names, start=1)
+    ]
+
+    if group_by is None:
+        row = (
+            db.query(*sums)
+            .join(ActualRun.planned_workout)
+            .filter(PlannedWorkout.plan_id == plan_id)
+            .one()
+        )
+        return dict(zip(zone_names, row))
+
+    group_col = HR_ZONE_GROUPS[group_by]
+    rows = (
+        db.query(group_col, *sums)
+        .join(ActualRun.planned_workout)
+        .filter(PlannedWorkout.plan_id == plan_id)
+        .group_by(group_col)
+        .order_by(group_col)
+    )
+    return [{group_by: key, **dict(zip(zone_names, zones))} for key, *zones in rows]
+
+
+def rolling_totals(db: Session, start: date, end: date, windows: List[int]) -> List[Dict[str, Any]]:
+    """Trailing mileage, time on feet and run count for each day, per window length in days.
+
+    One query: a dense series of days (generate_series on Postgres, a
+    recursive CTE on SQLite) left-joined to per-day run totals, summed with
+    ``ROWS`` window frames. The series starts early enough to fill the
+    longest window on ``start``.
+    """
+    lead_in = start - timedelta(days=max(windows) - 1)
+    lower = datetime.combine(lead_in, time.min)
+    upper = datetime.combine(end + timedelta(days=1), time.min)
+
+    if db.get_bind().dialect.name == "postgresql":
+        run_day = cast(ActualRun.started_at, Date)
+        days = select(
+            cast(
+                func.generate_series(cast(lead_in, Date), cast(end, Date), literal_column("interval '1 day'")),
+                Date,
+            ).label("day")
+        ).subquery("days")
+    else:
+        # SQLite stores dates as ISO text; date() keeps both sides comparable
+        run_day = func.date(ActualRun.started_at)
+        series = select(literal(lead_in.isoformat()).label("day")).cte("days", recursive=True)
+        days = series.union_all(
+            select(func.date(series.c.day, "+1 day")).where(series.c.day < end.isoformat())
+        )
+
+    daily = (
+        select(
+            run_day.label("day"),
+            func.sum(ActualRun.distance).label("miles"),
+            func.sum(ActualRun.duration_seconds).label("seconds"),
+            func.count(ActualRun.id).label("runs"),
+        )
+        .filter(ActualRun.started_at >= lower, ActualRun.started_at < upper)
+        .group_by(run_day)
+        .subquery("daily")
+    )
+
+    totals = {
+        "miles": func.coalesce(daily.c.miles, 0),
+        "seconds": func.coalesce(daily.c.seconds, 0),
+        "runs": func.coalesce(daily.c.runs, 0),
+    }
+    columns = [days.c.day.label("day")]
+    for window in windows:
+        for name, value in totals.items():
+            columns.append(
+                func.sum(value).over(order_by=days.c.day, rows=(-(window - 1), 0)).label(f"{name}_{window}d")
+            )
+    rolling = (
+        select(*columns)
+        .select_from(days.outerjoin(daily, daily.c.day == days.c.day))
+        .subquery("rolling")
+    )
+
+    start_day = start if db.get_bind().dialect.name == "postgresql" else start.isoformat()
+    rows = db.execute(select(rolling).filter(rolling.c.day >= start_day).order_by(rolling.c.day))
+    return [
+        {
+            "date": str(row.day),
+            **{
+                key: round(value or 0, 1) if key.startswith("miles") else int(value or 0)
+                for key, value in row._mapping.items()
+                if key != "day"
+            },
+        }
+        for row in rows
+    ]
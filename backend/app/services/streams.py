@@ -0,0 +1,273 @@
+"""Compact storage for per-second run samples (HR, pace, cadence, elevation, position).
+
+A stream is split into chunks of ``STREAM_CHUNK_SECONDS``. Each chunk stores
+every channel as fixed-point integers, delta-encoded into the narrowest
+integer type that fits, with a validity bitmap when samples are missing;
+the channels are concatenated and zlib-compressed. Range reads only
+decode the chunks they overlap, and ``run_streams.preview`` keeps a
+bucket-averaged copy of the whole run for overview charts.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import math
+import os
+import struct
+import zlib
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import RunStream, RunStreamChunk
+
+STREAM_CODEC = "delta-zlib-v1"
+
+# Channel -> (fixed-point scale, decimals in API output), in storage order
+STREAM_CHANNELS: Dict[str, Tuple[int, int]] = {
+    "t": (1, 0),  # seconds from the start of the run
+    "hr": (1, 0),  # bpm
+    "pace": (1, 0),  # seconds per mile
+    "cadence": (1, 0),  # steps per minute
+    "elevation": (10, 1),  # meters
+    "lat": (10 ** 7, 6),
+    "lon": (10 ** 7, 6),
+}
+
+# Largest absolute value accepted per channel; keeps scaled values well inside int64
+STREAM_LIMITS: Dict[str, float] = {
+    "t": 7 * 24 * 3600,
+    "hr": 300,
+    "pace": 24 * 3600,
+    "cadence": 400,
+    "elevation": 10000,
+    "lat": 90,
+    "lon": 180,
+}
+
+STREAM_CHUNK_SECONDS = int(os.environ.get("STREAM_CHUNK_SECONDS", "600"))
+STREAM_PREVIEW_POINTS = int(os.environ.get("STREAM_PREVIEW_POINTS", "500"))
+
+# Little-endian delta types, narrowest first; the index is stored per channel
+_DTYPES = [np.dtype("<i1"), np.dtype("<i2"), np.dtype("<i4"), np.dtype("<i8")]
+
+
+class InvalidStream(ValueError):
+    """Samples that can't be stored as a stream."""
+
+
+def _encode_channel(values: np.ndarray, scale: int) -> bytes:
+    valid = ~np.isnan(values)
+    ints = np.zeros(len(values), dtype=np.int64)
+    ints[valid] = np.round(values[valid] * scale)
+    if not valid.all():
+        # Hold the last valid value across gaps so they encode as zero deltas
+        last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(values)), -1))
+        ints = np.where(last_valid >= 0, ints[np.maximum(last_valid, 0)], 0)
+
+    deltas = np.diff(ints, prepend=0)
+    low, high = (int(deltas.min()), int(deltas.max())) if len(deltas) else (0, 0)
+    code = next(i for i, dtype in enumerate(_DTYPES) if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max)
+
+    has_mask = not valid.all()
+    mask = np.packbits(valid).tobytes() if has_mask else b""
+    return struct.pack("<BB", code, has_mask) + mask + deltas.astype(_DTYPES[code]).tobytes()
+
+
+def encode_samples(samples: Dict[str, np.ndarray], channels: Sequence[str]) -> bytes:
+    """Compress equal-length channel arrays (NaN for missing samples)."""
+    return zlib.compress(b"".join(_encode_channel(samples[c], STREAM_CHANNELS[c][0]) for c in channels))
+
+
+def decode_samples(payload: bytes, channels: Sequence[str], count: int) -> Dict[str, np.ndarray]:
+    """Inverse of ``encode_samples``: float arrays with NaN for missing samples."""
+    data = zlib.decompress(payload)
+    offset = 0
+    decoded = {}
+    for channel in channels:
+        code, has_mask = struct.unpack_from("<BB", data, offset)
+        offset += 2
+        valid = None
+        if has_mask:
+            mask_bytes = math.ceil(count / 8)
+            valid = np.unpackbits(np.frombuffer(data, np.uint8, mask_bytes, offset))[:count].astype(bool)
+            offset += mask_bytes
+        dtype = _DTYPES[code]
+        deltas = np.frombuffer(data, dtype, count, offset)
+        offset += count * dtype.itemsize
+
+        values = np.cumsum(deltas, dtype=np.int64) / STREAM_CHANNELS[channel][0]
+        if valid is not None:
+            values[~valid] = np.nan
+        decoded[channel] = values
+    return decoded
+
+
+def bucket_means(samples: Dict[str, np.ndarray], max_points: int) -> Dict[str, np.ndarray]:
+    """Downsample to at most ``max_points`` by averaging consecutive samples.
+
+    ``t`` takes each bucket's first sample time; missing samples are ignored.
+    """
+    count = len(samples["t"])
+    if count <= max_points:
+        return samples
+    starts = np.unique(np.linspace(0, count, max_points, endpoint=False).astype(int))
+
+    result = {"t": samples["t"][starts]}
+    for channel, values in samples.items():
+        if channel == "t":
+            continue
+        valid = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(valid, values, 0), starts)
+        counts = np.add.reduceat(valid.astype(int), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[channel] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    return result
+
+
+def build_stream(run_id: int, samples: Dict[str, Sequence[Optional[float]]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Column values for a run's ``run_streams`` row and its ``run_stream_chunks`` rows.
+
+    ``samples`` maps channel names to equal-length lists; ``t`` (seconds
+    from the start, non-decreasing) is required and other channels are
+    optional, with None for missing samples.
+    """
+    unknown = set(samples) - set(STREAM_CHANNELS)
+    if unknown:
+        raise InvalidStream(f"Unknown channels: {', '.join(sorted(unknown))}")
+    if not samples.get("t"):
+        raise InvalidStream("t is required and must not be empty")
+    channels = [c for c in STREAM_CHANNELS if samples.get(c) is not None]
+    arrays = {c: np.array(samples[c], dtype=float) for c in channels}
+
+    t = arrays["t"]
+    if any(len(arrays[c]) != len(t) for c in channels):
+        raise InvalidStream("All channels must have as many samples as t")
+    for c in channels:
+        # NaN marks a missing sample; anything else must be a finite value in range
+        present = arrays[c][~np.isnan(arrays[c])]
+        if not np.isfinite(present).all() or (np.abs(present) > STREAM_LIMITS[c]).any():
+            raise InvalidStream(f"{c} values must be finite and within ±{STREAM_LIMITS[c]:g}")
+    if np.isnan(t).any() or t[0] < 0 or (np.diff(t) < 0).any():
+        raise InvalidStream("t must be non-negative and non-decreasing")
+
+    # Chunk boundaries fall on multiples of STREAM_CHUNK_SECONDS
+    chunk_of = (t // STREAM_CHUNK_SECONDS).astype(int)
+    bounds = np.flatnonzero(np.diff(chunk_of)) + 1
+    chunks = []
+    for index, (lo, hi) in enumerate(zip(np.r_[0, bounds], np.r_[bounds, len(t)])):
+        part = {c: arrays[c][lo:hi] for c in channels}
+        chunks.append({
+            "run_id": run_id,
+            "chunk_index": index,
+            "start_offset": int(part["t"][0]),
+            "end_offset": int(math.ceil(part["t"][-1])),
+            "sample_count": int(hi - lo),
+            "payload": encode_samples(part, channels),
+        })
+
+    preview = bucket_means(arrays, STREAM_PREVIEW_POINTS)
+    header = {
+        "run_id": run_id,
+        "codec": STREAM_CODEC,
+        "channels": ",".join(channels),
+        "sample_count": len(t),
+        "duration_seconds": int(math.ceil(t[-1])),
+        "preview_count": len(preview["t"]),
+        "preview": encode_samples(preview, channels),
+    }
+    return header, chunks
+
+
+def store_streams(db: Session, streams: Dict[int, Dict[str, Sequence[Optional[float]]]], batch_size: int = 500) -> int:
+    """Replace the streams of several runs with bulk inserts. Does not commit.
+
+    Returns the number of chunks written.
+    """
+    return write_streams(db, {run_id: build_stream(run_id, samples) for run_id, samples in streams.items()}, batch_size)
+
+
+def write_streams(
+    db: Session,
+    built: Dict[int, Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    batch_size: int = 500,
+) -> int:
+    """Replace the streams of several runs with rows from ``build_stream``. Does not commit.
+
+    Returns the number of chunks written.
+    """
+    if not built:
+        return 0
+    headers, chunks = [], []
+    for header, run_chunks in built.values():
+        headers.append(header)
+        chunks.extend(run_chunks)
+
+    run_ids = list(built)
+    db.execute(delete(RunStreamChunk).where(RunStreamChunk.run_id.in_(run_ids)))
+    db.execute(delete(RunStream).where(RunStream.run_id.in_(run_ids)))
+    db.execute(insert(RunStream), headers)
+    for i in range(0, len(chunks), batch_size):
+        db.execute(insert(RunStreamChunk), chunks[i:i + batch_size])
+    return len(chunks)
+
+
+def _to_json(values: np.ndarray, decimals: int) -> List[Optional[float]]:
+    rounded = np.round(values, decimals)
+    if decimals == 0:
+        return [None if math.isnan(v) else int(v) for v in rounded.tolist()]
+    return [None if math.isnan(v) else v for v in rounded.tolist()]
+
+
+async def read_stream(
+    db: AsyncSession,
+    run_id: int,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """A run's samples between two offsets (seconds), optionally downsampled.
+
+    Only chunks overlapping the range are read and decompressed. A
+    downsampled request for the whole run at or below the preview's
+    resolution is served from the preview alone. Returns None if the run
+    has no stream.
+    """
+    header = await db.get(RunStream, run_id)
+    if header is None:
+        return None
+    channels = header.channels.split(",")
+
+    if start is None and end is None and max_points is not None and max_points <= header.preview_count:
+        samples = decode_samples(header.preview, channels, header.preview_count)
+    else:
+        query = (
+            select(RunStreamChunk.sample_count, RunStreamChunk.payload)
+            .filter(RunStreamChunk.run_id == run_id)
+            .order_by(RunStreamChunk.chunk_index)
+        )
+        if start is not None:
+            query = query.filter(RunStreamChunk.end_offset >= start)
+        if end is not None:
+            query = query.filter(RunStreamChunk.start_offset <= end)
+        parts = [decode_samples(payload, channels, count) for count, payload in await db.execute(query)]
+        samples = {
+            c: np.concatenate([p[c] for p in parts]) if parts else np.empty(0)
+            for c in channels
+        }
+        in_range = np.ones(len(samples["t"]), dtype=bool)
+        if start is not None:
+            in_range &= samples["t"] >= start
+        if end is not None:
+            in_range &= samples["t"] <= end
+        samples = {c: v[in_range] for c, v in samples.items()}
+
+    if max_points is not None:
+        samples = bucket_means(samples, max_points)
+
+    return {
+        "run_id": run_id,
+        "sample_count": header.sample_count,
+        "duration_seconds": header.duration_seconds,
+        "points": len(samples["t"]),
+        **{c: _to_json(samples[c], STREAM_CHANNELS[c][1]) for c in channels},
+    }
@@ -0,0 +1,82 @@
+"""High-water marks for incremental Garmin syncs."""
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Optional, Dict
+import os
+
+from app.models import SyncCursor, TrainingPlan
+
+DATA_TYPES = ("activities", "sleep", "hrv", "weather")
+
+# Days re-fetched before the cursor to catch late uploads (override with SYNC_OVERLAP_DAYS)
+OVERLAP_DAYS = int(os.environ.get("SYNC_OVERLAP_DAYS", "2"))
+
+SYNC_MODES = ("incremental", "full")
+
+
+def get_cursors(db: Session, plan_id: int) -> Dict[str, date]:
+    """Synced-through dates for a plan, by data type."""
+    return {
+        cursor.data_type: cursor.synced_through
+        for cursor in db.query(SyncCursor).filter(SyncCursor.plan_id == plan_id)
+    }
+
+
+def incremental_start(db: Session, plan_id: int, data_type: str) -> Optional[date]:
+    """Where an incremental sync should resume, or None if never synced."""
+    cursor = (
+        db.query(SyncCursor.synced_through)
+        .filter(SyncCursor.plan_id == plan_id)
+        .filter(SyncCursor.data_type == data_type)
+        .scalar()
+    )
+    if cursor is None:
+        return None
+    return cursor - timedelta(days=OVERLAP_DAYS)
+
+
+def sync_start(db: Session, plan: TrainingPlan, data_type: str, mode: str, requested: Optional[date] = None) -> date:
+    """First date a sync of one data type should cover.
+
+    An explicitly requested start wins; otherwise incremental syncs resume
+    from the type's own cursor (minus the overlap) and full syncs start at
+    the beginning of the plan.
+    """
+    if requested is not None:
+        return requested
+    if mode == "incremental":
+        resume = incremental_start(db, plan.id, data_type)
+        if resume:
+            return max(plan.start_date, resume)
+    return plan.start_date
+
+
+def advance_cursor(db: Session, plan_id: int, data_type: str, synced_from: date, synced_through: date):
+    """Record that ``synced_from``..``synced_through`` was synced. Does not commit.
+
+    The cursor only moves forward, and only if the range is contiguous with
+    what was already synced (it starts no later than the day after the
+    cursor, or the plan start for a new cursor); otherwise the gap in
+    between would be skipped for good. Callers stop ``synced_through``
+    short of any date that failed.
+    """
+    cursor = (
+        db.query(SyncCursor)
+        .filter(SyncCursor.plan_id == plan_id)
+        .filter(SyncCursor.data_type == data_type)
+        .first()
+    )
+    if cursor is not None:
+        synced = cursor.synced_through
+    else:
+        plan_start = db.query(TrainingPlan.start_date).filter(TrainingPlan.id == plan_id).scalar()
+        if plan_start is None:
+            return
+        synced = plan_start - timedelta(days=1)
+
+    if synced_from > synced + timedelta(days=1) or synced_through <= synced:
+        return
+    if cursor is None:
+        db.add(SyncCursor(plan_id=plan_id, data_type=data_type, synced_through=synced_through))
+    else:
+        cursor.synced_through = synced_through
@@ -0,0 +1,185 @@
+"""Background Garmin sync jobs with progress tracking."""
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, Set, Tuple
+import asyncio
+import traceback
+import uuid
+
+from app.database import SessionLocal
+
+# Finished jobs kept in memory for status lookups
+MAX_FINISHED_JOBS = 50
+
+
+class SyncJob:
+    """A queued or running Garmin sync and its progress counters."""
+
+    def __init__(self, plan_id: int, start_date: Optional[date], end_date: Optional[date], mode: str):
+        self.id = uuid.uuid4().hex
+        self.plan_id = plan_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.mode = mode
+        self.status = "queued"  # queued, running, succeeded, failed
+
+        self.activities_fetched = 0
+        self.activities_matched = 0
+        self.activities_synced = 0
+        self.weather_enriched = 0
+        self.splits_imported = 0
+        self.streams_imported = 0
+        self.errors: List[str] = []
+        self.synced: List[Dict[str, Any]] = []
+
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        # Bumped on every change; each waiting listener has its own event
+        self.version = 0
+        self._waiters: Set[asyncio.Event] = set()
+
+    @property
+    def key(self) -> Tuple[int, Optional[date], Optional[date]]:
+        return (self.plan_id, self.start_date, self.end_date)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update(self, **counts: int):
+        """Add to progress counters and wake anyone watching the job."""
+        for name, value in counts.items():
+            setattr(self, name, getattr(self, name) + value)
+        self._notify()
+
+    def add_error(self, message: str):
+        """Record a non-fatal error."""
+        self.errors.append(message)
+        self._notify()
+
+    async def wait_for_change(self, seen: int, timeout: float) -> int:
+        """Wait until the job changes after version ``seen``, or the timeout passes.
+
+        Returns the current version. Returns at once if a change was already
+        made since ``seen``, so nothing is missed between two waits.
+        """
+        if self.version != seen:
+            return self.version
+        changed = asyncio.Event()
+        self._waiters.add(changed)
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters.discard(changed)
+        return self.version
+
+    def _notify(self):
+        self.version += 1
+        for changed in self._waiters:
+            changed.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "plan_id": self.plan_id,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "mode": self.mode,
+            "status": self.status,
+            "activities_fetched": self.activities_fetched,
+            "activities_matched": self.activities_matched,
+            "activities_synced": self.activities_synced,
+            "weather_enriched": self.weather_enriched,
+            "splits_imported": self.splits_imported,
+            "streams_imported": self.streams_imported,
+            "errors": self.errors,
+            "activities": self.synced,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class SyncJobManager:
+    """Runs sync jobs in the background, reusing a live job for the same plan and range."""
+
+    def __init__(self):
+        self.jobs: Dict[str, SyncJob] = {}
+        self._active: Dict[Tuple[int, Optional[date], Optional[date]], SyncJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def enqueue(
+        self,
+        service,
+        plan_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        mode: str = "incremental",
+    ) -> Tuple[SyncJob, bool]:
+        """Start a sync job, or return the one already running for this plan and range.
+
+        A running job is reused whatever its mode, so an incremental and a
+        full sync of the same range never write the same rows concurrently.
+        Returns the job and whether it was newly created.
+        """
+        key = (plan_id, start_date, end_date)
+        existing = self._active.get(key)
+        if existing is not None and not existing.done:
+            return existing, False
+
+        job = SyncJob(plan_id, start_date, end_date, mode)
+        self.jobs[job.id] = job
+        self._active[key] = job
+        self._tasks[job.id] = asyncio.create_task(self._run(job, service))
+        self._prune()
+        return job, True
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        return self.jobs.get(job_id)
+
+    def recent(self) -> List[SyncJob]:
+        return sorted(self.jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def running(self) -> List[SyncJob]:
+        """Jobs that are queued or still running."""
+        return [job for job in self.jobs.values() if not job.done]
+
+    async def _run(self, job: SyncJob, service):
+        """Run one job with its own database session."""
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        job._notify()
+
+        db = SessionLocal()
+        try:
+            job.synced = await service.sync_activities(
+                db=db,
+                plan_id=job.plan_id,
+                start_date=job.start_date,
+                end_date=job.end_date,
+                progress=job,
+                mode=job.mode,
+            )
+            job.status = "succeeded"
+        except Exception as e:
+            traceback.print_exc()
+            job.errors.append(f"Sync failed: {e}")
+            job.status = "failed"
+        finally:
+            db.close()
+            job.finished_at = datetime.utcnow()
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            self._tasks.pop(job.id, None)
+            job._notify()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond the retention limit."""
+        finished = [j for j in self.recent() if j.done]
+        for job in finished[MAX_FINISHED_JOBS:]:
+            del self.jobs[job.id]
+
+
+sync_jobs = SyncJobManager()
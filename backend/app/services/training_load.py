@@ -0,0 +1,187 @@
+"""Training load model: daily TRIMP with acute (ATL) and chronic (CTL) load and form (TSB).
+
+ATL and CTL are exponentially weighted averages of daily load. They are
+materialized per day in ``training_load_days``; a change to the runs on
+some day only recomputes the rows from that day on, seeded from the
+stored values of the day before.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import os
+
+import numpy as np
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models import ActualRun, TrainingLoadDay
+from app.models.run import HR_ZONE_COUNT
+
+# Time constants of the acute and chronic load averages, in days
+ATL_DAYS = float(os.environ.get("ATL_DAYS", "7"))
+CTL_DAYS = float(os.environ.get("CTL_DAYS", "42"))
+
+# Used for Banister TRIMP when a run has average HR but no zone times
+TRAINING_LOAD_REST_HR = float(os.environ.get("TRAINING_LOAD_REST_HR", "60"))
+TRAINING_LOAD_MAX_HR = float(os.environ.get("TRAINING_LOAD_MAX_HR", "190"))
+
+# Postgres advisory lock serializing concurrent refreshes (e.g. per-plan cron syncs)
+TRAINING_LOAD_LOCK_KEY = 2026041104
+
+_ZONE_COLUMNS = [getattr(ActualRun, f"hr_zone{n}_seconds") for n in range(1, HR_ZONE_COUNT + 1)]
+
+
+def run_loads(duration_seconds: np.ndarray, avg_hr: np.ndarray, zone_seconds: np.ndarray) -> np.ndarray:
+    """TRIMP for each run. Missing values are NaN.
+
+    Runs with HR zone times use Edwards' TRIMP (minutes in zone x zone
+    number); otherwise Banister's TRIMP from average HR. Runs with neither
+    carry no load.
+    """
+    has_zones = ~np.isnan(zone_seconds).all(axis=1)
+    weights = np.arange(1, HR_ZONE_COUNT + 1)
+    edwards = np.nan_to_num(zone_seconds) @ weights / 60
+
+    reserve = np.clip(
+        (avg_hr - TRAINING_LOAD_REST_HR) / (TRAINING_LOAD_MAX_HR - TRAINING_LOAD_REST_HR), 0, 1
+    )
+    banister = duration_seconds / 60 * reserve * 0.64 * np.exp(1.92 * reserve)
+
+    loads = np.where(has_zones, edwards, banister)
+    return np.nan_to_num(loads)
+
+
+def ewma(loads: np.ndarray, days: float, seed: float = 0.0) -> np.ndarray:
+    """Exponentially weighted average of a daily series, starting from ``seed``.
+
+    Vectorized form of ``x[t] = x[t-1] + (loads[t] - x[t-1]) * (1 - exp(-1/days))``,
+    evaluated in blocks so the decay factors stay within float range.
+    """
+    decay = np.exp(-1 / days)
+    block = max(1, int(30 * days))
+    out = np.empty(len(loads))
+    previous = seed
+    for start in range(0, len(loads), block):
+        chunk = loads[start:start + block]
+        steps = np.arange(len(chunk))
+        powers = decay ** steps
+        # x[j] = decay^(j+1) * previous + (1 - decay) * sum_{i<=j} decay^(j-i) * loads[i]
+        values = decay * powers * previous + (1 - decay) * powers * np.cumsum(chunk / powers)
+        out[start:start + len(chunk)] = values
+        previous = values[-1]
+    return out
+
+
+def _run_day_range(db: Session) -> Optional[Tuple[date, date]]:
+    first, last = db.execute(select(func.min(ActualRun.started_at), func.max(ActualRun.started_at))).one()
+    if first is None:
+        return None
+    return first.date(), last.date()
+
+
+def refresh_training_load(db: Session, since: Optional[date] = None) -> int:
+    """Recompute the materialized training load from ``since`` through today.
+
+    Without ``since``, or when the day before it was never computed,
+    rebuilds from the first run. Returns the number of days written.
+    Does not commit.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": TRAINING_LOAD_LOCK_KEY})
+    # Session is created with autoflush disabled; make pending runs visible
+    db.flush()
+
+    run_days = _run_day_range(db)
+    if run_days is None:
+        db.query(TrainingLoadDay).delete(synchronize_session=False)
+        return 0
+    first_day, last_day = run_days
+
+    start, seed_atl, seed_ctl = first_day, 0.0, 0.0
+    if since is not None and since > first_day:
+        previous = db.get(TrainingLoadDay, since - timedelta(days=1))
+        if previous is not None:
+            start, seed_atl, seed_ctl = since, previous.atl, previous.ctl
+    end = max(date.today(), last_day)
+    computed = _compute_days(db, start, end, seed_atl, seed_ctl)
+
+    if start == first_day:
+        # Full rebuild; also drops days before the first run left by deleted runs
+        db.query(TrainingLoadDay).delete(synchronize_session=False)
+    else:
+        db.query(TrainingLoadDay).filter(TrainingLoadDay.day >= start).delete(synchronize_session=False)
+
+    db.execute(insert(TrainingLoadDay), computed)
+    db.flush()
+    return len(computed)
+
+
+def _compute_days(db: Session, start: date, end: date, seed_atl: float, seed_ctl: float) -> List[Dict[str, Any]]:
+    """``training_load_days`` values from ``start`` through ``end``, seeded with the day before's ATL and CTL."""
+    rows = db.execute(
+        select(ActualRun.started_at, ActualRun.duration_seconds, ActualRun.avg_hr, *_ZONE_COLUMNS)
+        .filter(ActualRun.started_at >= datetime.combine(start, time.min))
+        .filter(ActualRun.started_at < datetime.combine(end + timedelta(days=1), time.min))
+    ).all()
+
+    days = (end - start).days + 1
+    daily = np.zeros(days)
+    if rows:
+        offsets = np.array([(r[0].date() - start).days for r in rows])
+        values = np.array([r[1:] for r in rows], dtype=float)
+        loads = run_loads(values[:, 0], values[:, 1], values[:, 2:])
+        daily = np.bincount(offsets, weights=loads, minlength=days)
+
+    atl = ewma(daily, ATL_DAYS, seed_atl)
+    ctl = ewma(daily, CTL_DAYS, seed_ctl)
+    # Form is the balance going into the day, before its own training
+    tsb = np.concatenate(([seed_ctl - seed_atl], (ctl - atl)[:-1]))
+
+    return [
+        {
+            "day": start + timedelta(days=i),
+            "load": float(daily[i]),
+            "atl": float(atl[i]),
+            "ctl": float(ctl[i]),
+            "tsb": float(tsb[i]),
+        }
+        for i in range(days)
+    ]
+
+
+def get_training_load(db: Session, start: date, end: date) -> List[Dict[str, Any]]:
+    """Daily load, ATL, CTL and TSB between two dates.
+
+    Read-only: days after the last stored one (days without runs since the
+    last refresh, or everything before the first refresh) are computed for
+    this response but not written; run writes and syncs persist them.
+    """
+    days = [
+        {"day": row.day, "load": row.load, "atl": row.atl, "ctl": row.ctl, "tsb": row.tsb}
+        for row in db.query(TrainingLoadDay)
+        .filter(TrainingLoadDay.day >= start, TrainingLoadDay.day <= end)
+        .order_by(TrainingLoadDay.day)
+    ]
+
+    latest = db.query(TrainingLoadDay).order_by(TrainingLoadDay.day.desc()).first()
+    run_days = _run_day_range(db)
+    if latest is not None:
+        tail_start, seed_atl, seed_ctl = latest.day + timedelta(days=1), latest.atl, latest.ctl
+    elif run_days is not None:
+        tail_start, seed_atl, seed_ctl = run_days[0], 0.0, 0.0
+    else:
+        tail_start = None
+    if tail_start is not None:
+        tail_end = min(end, max(date.today(), run_days[1] if run_days else tail_start))
+        if tail_start <= tail_end:
+            days += [d for d in _compute_days(db, tail_start, tail_end, seed_atl, seed_ctl) if d["day"] >= start]
+
+    return [
+        {
+            "date": d["day"].isoformat(),
+            "load": round(d["load"], 1),
+            "atl": round(d["atl"], 1),
+            "ctl": round(d["ctl"], 1),
+            "tsb": round(d["tsb"], 1),
+        }
+        for d in days
+    ]
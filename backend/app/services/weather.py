@@ -1,7 +1,32 @@
 """Weather service using Open-Meteo API."""
 import httpx
-from datetime import datetime
-from typing import Dict, Any
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import os
+
+from app.database import dialect_insert
+from app.models import WeatherCache
+
+# Runs whose coordinates round to the same cell share one archive request
+LOCATION_PRECISION = 2  # decimal places, roughly 1 km
+
+# Dates further apart than this within a cell are fetched as separate ranges
+MAX_RANGE_GAP_DAYS = 31
+
+# Concurrent archive requests during a batch
+MAX_CONCURRENT_REQUESTS = 4
+
+# Cached days older than this are refetched, and the cache is capped in size
+CACHE_TTL_DAYS = int(os.environ.get("WEATHER_CACHE_TTL_DAYS", "90"))
+CACHE_MAX_ENTRIES = int(os.environ.get("WEATHER_CACHE_MAX_ENTRIES", "20000"))
+CACHE_INSERT_BATCH_SIZE = 200
+
+# Open-Meteo's archive can take this long to fill in a day's data
+ARCHIVE_LAG_DAYS = 7
+
+HOURLY_FIELDS = "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,weather_code,wind_speed_10m,wind_direction_10m"
 
 
 class WeatherService:
@@ -9,6 +34,25 @@ class WeatherService:
 
     BASE_URL = "https://archive-api.open-meteo.com/v1/archive"
 
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived pooled HTTP client, so connections are reused across requests."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0),
+                limits=httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS, max_keepalive_connections=MAX_CONCURRENT_REQUESTS),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def get_historical_weather(
         self,
         lat: float,
@@ -16,36 +60,212 @@ class WeatherService:
         dt: datetime,
     ) -> Dict[str, Any]:
         """Fetch historical weather for a specific location and time."""
-        date_str = dt.date().isoformat()
-        hour = dt.hour
+        hourly = await self._fetch_hourly(lat, lon, dt.date(), dt.date())
+        return self._weather_at(hourly, dt)
+
+    async def get_historical_weather_batch(
+        self,
+        points: List[Tuple[float, float, datetime]],
+        db: Optional[Session] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Fetch historical weather for many (lat, lon, local time) points.
+
+        Points are grouped by rounded location and each group's dates are
+        fetched as one start_date-end_date range, so many runs from the same
+        place cost a single request. With a session, days already in the
+        weather cache are served from the database and fetched days are stored
+        (the caller commits). Results are returned in input order, with None
+        for points whose range could not be fetched.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(points)
+        pending = list(range(len(points)))
+        cache_hits: List[int] = []
+
+        if db is not None:
+            # Database work runs in a worker thread so the event loop isn't blocked
+            cached, cache_hits = await asyncio.to_thread(self._load_cached_days, db, points)
+            pending = []
+            for i, (lat, lon, dt) in enumerate(points):
+                hourly = cached.get((*self._grid_key(lat, lon), dt.date()))
+                if hourly is not None:
+                    results[i] = self._weather_at(hourly, dt)
+                else:
+                    pending.append(i)
+
+        # Group point indexes by location cell
+        cells: Dict[Tuple[float, float], List[int]] = {}
+        for i in pending:
+            lat, lon, dt = points[i]
+            cells.setdefault(self._cell(lat, lon), []).append(i)
+
+        # Split each cell's dates into ranges without long gaps
+        ranges = []
+        for (lat, lon), indexes in cells.items():
+            indexes.sort(key=lambda i: points[i][2])
+            span = [indexes[0]]
+            for i in indexes[1:]:
+                if (points[i][2].date() - points[span[-1]][2].date()).days > MAX_RANGE_GAP_DAYS:
+                    ranges.append((lat, lon, span))
+                    span = []
+                span.append(i)
+            ranges.append((lat, lon, span))
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        fetched: List[Tuple[float, float, Dict[str, Any]]] = []
+
+        async def fetch_range(lat: float, lon: float, span: List[int]):
+            start, end = points[span[0]][2].date(), points[span[-1]][2].date()
+            async with semaphore:
+                try:
+                    hourly = await self._fetch_hourly(lat, lon, start, end)
+                    weather = [self._weather_at(hourly, points[i][2]) for i in span]
+                except Exception as e:
+                    # Network, decode or unexpected payload errors only lose this range
+                    print(f"Failed to fetch weather for {lat},{lon} {start}..{end}: {e}")
+                    return
+            fetched.append((lat, lon, hourly))
+            for i, value in zip(span, weather):
+                results[i] = value
 
+        await asyncio.gather(*(fetch_range(lat, lon, span) for lat, lon, span in ranges))
+
+        # Cache writes happen after the network calls so no write lock is held while waiting
+        if db is not None and (cache_hits or fetched):
+            await asyncio.to_thread(self._update_cache, db, cache_hits, fetched)
+
+        return results
+
+    def _update_cache(self, db: Session, cache_hits: List[int], fetched: List[Tuple[float, float, Dict[str, Any]]]):
+        """Touch the cache rows used and store fetched days (the caller commits)."""
+        if cache_hits:
+            db.query(WeatherCache).filter(WeatherCache.id.in_(cache_hits)).update(
+                {WeatherCache.last_used_at: datetime.utcnow()}, synchronize_session=False
+            )
+        if fetched:
+            self._store_cached_days(db, fetched)
+            evict_weather_cache(db)
+
+    def _load_cached_days(
+        self,
+        db: Session,
+        points: List[Tuple[float, float, datetime]],
+    ) -> Tuple[Dict[Tuple[int, int, date], Dict[str, Any]], List[int]]:
+        """Load usable cached days for the points' cells and dates in one query.
+
+        Returns the hourly data by (lat_cell, lon_cell, date) and the IDs of the
+        cache rows used.
+        """
+        keys = {(*self._grid_key(lat, lon), dt.date()) for lat, lon, dt in points}
+        if not keys:
+            return {}, []
+
+        now = datetime.utcnow()
+        rows = (
+            db.query(WeatherCache)
+            .filter(WeatherCache.lat_cell.in_({k[0] for k in keys}))
+            .filter(WeatherCache.lon_cell.in_({k[1] for k in keys}))
+            .filter(WeatherCache.date.in_({k[2] for k in keys}))
+            .filter(WeatherCache.fetched_at >= now - timedelta(days=CACHE_TTL_DAYS))
+            .all()
+        )
+
+        usable = {}
+        hits = []
+        for row in rows:
+            key = (row.lat_cell, row.lon_cell, row.date)
+            if key not in keys:
+                continue
+            # The archive fills in recent days late; refetch incomplete ones while they may change
+            incomplete = any(v is None for v in row.hourly.get("temperature_2m", [None]))
+            if incomplete and (row.fetched_at.date() - row.date).days < ARCHIVE_LAG_DAYS:
+                continue
+            usable[key] = row.hourly
+            hits.append(row.id)
+        return usable, hits
+
+    def _store_cached_days(self, db: Session, fetched: List[Tuple[float, float, Dict[str, Any]]]):
+        """Split fetched ranges into per-day entries and upsert them into the cache."""
+        now = datetime.utcnow()
+        rows = {}
+        for lat, lon, hourly in fetched:
+            lat_cell, lon_cell = self._grid_key(lat, lon)
+            times = hourly.get("time", [])
+            days: Dict[str, List[int]] = {}
+            for i, t in enumerate(times):
+                days.setdefault(t[:10], []).append(i)
+            for day, indexes in days.items():
+                day_hourly = {
+                    key: [values[i] for i in indexes if i < len(values)]
+                    for key, values in hourly.items()
+                    if isinstance(values, list)
+                }
+                rows[(lat_cell, lon_cell, day)] = {
+                    "lat_cell": lat_cell,
+                    "lon_cell": lon_cell,
+                    "date": date.fromisoformat(day),
+                    "hourly": day_hourly,
+                    "fetched_at": now,
+                    "last_used_at": now,
+                }
+
+        rows = list(rows.values())
+        for i in range(0, len(rows), CACHE_INSERT_BATCH_SIZE):
+            stmt = dialect_insert(db, WeatherCache).values(rows[i:i + CACHE_INSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["lat_cell", "lon_cell", "date"],
+                set_={
+                    "hourly": stmt.excluded.hourly,
+                    "fetched_at": stmt.excluded.fetched_at,
+                    "last_used_at": stmt.excluded.last_used_at,
+                },
+            )
+            db.execute(stmt)
+
+    def _grid_key(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Integer grid cell used as the cache key."""
+        scale = 10 ** LOCATION_PRECISION
+        return round(lat * scale), round(lon * scale)
+
+    async def _fetch_hourly(self, lat: float, lon: float, start: date, end: date) -> Dict[str, Any]:
+        """Fetch hourly archive data for a location and inclusive date range."""
         params = {
             "latitude": lat,
             "longitude": lon,
-            "start_date": date_str,
-            "end_date": date_str,
-            "hourly": "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,weather_code,wind_speed_10m,wind_direction_10m",
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "hourly": HOURLY_FIELDS,
             "temperature_unit": "fahrenheit",
             "wind_speed_unit": "mph",
             "precipitation_unit": "inch",
             "timezone": "auto",
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = await self.client.get(self.BASE_URL, params=params)
+        response.raise_for_status()
+        return response.json().get("hourly", {})
 
-        hourly = data.get("hourly", {})
+    def _weather_at(self, hourly: Dict, dt: datetime) -> Dict[str, Any]:
+        """Extract the weather for one local hour from hourly archive data."""
+        # Times are local ("2026-02-01T07:00") because of timezone=auto
+        times = hourly.get("time", [])
+        key = dt.strftime("%Y-%m-%dT%H:00")
+        index = None
+        if times:
+            # Series are contiguous from midnight of the first day, 24 entries per day
+            first_day = date.fromisoformat(times[0][:10])
+            guess = (dt.date() - first_day).days * 24 + dt.hour
+            if 0 <= guess < len(times) and times[guess] == key:
+                index = guess
+            elif key in times:
+                index = times.index(key)
 
-        # Get data for the specific hour
-        temp = self._get_hourly_value(hourly, "temperature_2m", hour)
-        feels_like = self._get_hourly_value(hourly, "apparent_temperature", hour)
-        humidity = self._get_hourly_value(hourly, "relative_humidity_2m", hour)
-        wind_speed = self._get_hourly_value(hourly, "wind_speed_10m", hour)
-        wind_dir = self._get_hourly_value(hourly, "wind_direction_10m", hour)
-        precip = self._get_hourly_value(hourly, "precipitation", hour)
-        weather_code = self._get_hourly_value(hourly, "weather_code", hour)
+        temp = self._get_hourly_value(hourly, "temperature_2m", index)
+        feels_like = self._get_hourly_value(hourly, "apparent_temperature", index)
+        humidity = self._get_hourly_value(hourly, "relative_humidity_2m", index)
+        wind_speed = self._get_hourly_value(hourly, "wind_speed_10m", index)
+        wind_dir = self._get_hourly_value(hourly, "wind_direction_10m", index)
+        precip = self._get_hourly_value(hourly, "precipitation", index)
+        weather_code = self._get_hourly_value(hourly, "weather_code", index)
 
         return {
             "temperature": temp,
@@ -57,11 +277,15 @@ class WeatherService:
             "precipitation": precip,
         }
 
-    def _get_hourly_value(self, hourly: Dict, key: str, hour: int):
-        """Get a value from hourly data for a specific hour."""
+    def _cell(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Round a location to its grid cell."""
+        return round(lat, LOCATION_PRECISION), round(lon, LOCATION_PRECISION)
+
+    def _get_hourly_value(self, hourly: Dict, key: str, index: Optional[int]):
+        """Get a value from hourly data at a position in the time series."""
         values = hourly.get(key, [])
-        if hour < len(values):
-            return values[hour]
+        if index is not None and index < len(values):
+            return values[index]
         return None
 
     def _degrees_to_direction(self, degrees: float) -> str:
@@ -102,3 +326,30 @@ class WeatherService:
             99: "Heavy Thunderstorm",
         }
         return conditions.get(code, "Unknown")
+
+
+def evict_weather_cache(db: Session) -> int:
+    """Drop expired cache entries, then the least recently used beyond the size cap.
+
+    Returns the number of entries removed. Does not commit.
+    """
+    removed = (
+        db.query(WeatherCache)
+        .filter(WeatherCache.fetched_at < datetime.utcnow() - timedelta(days=CACHE_TTL_DAYS))
+        .delete(synchronize_session=False)
+    )
+
+    overflow = db.query(WeatherCache).count() - CACHE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = (
+            db.query(WeatherCache.id)
+            .order_by(WeatherCache.last_used_at)
+            .limit(overflow)
+            .subquery()
+        )
+        removed += (
+            db.query(WeatherCache)
+            .filter(WeatherCache.id.in_(oldest.select()))
+            .delete(synchronize_session=False)
+        )
+    return removed
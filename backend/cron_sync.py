@@ -11,18 +11,25 @@ import os
 import sys
 import json
 import base64
+import fcntl
 import asyncio
 import tempfile
-from datetime import date, timedelta
+from contextlib import contextmanager
+from datetime import date
 
 # Add the app to the path
 sys.path.insert(0, os.path.dirname(__file__))
 
 from garminconnect import Garmin
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.database import engine, SessionLocal
 from app.models import TrainingPlan, PlannedWorkout, ActualRun
 from app.services.garmin_sync import GarminSyncService
+from app.services.change_feed import prune_change_log
+
+# Advisory lock ID shared by all cron sync processes
+CRON_LOCK_KEY = 2026041101
 
 
 def load_garmin_tokens():
@@ -83,24 +90,74 @@ async def sync_active_plans(db: Session, token_path: str):
     sync_service = GarminSyncService("", "")
     sync_service.client = client
 
-    # Sync last 7 days for each active plan
-    start_date = today - timedelta(days=7)
-    end_date = today
+    # Fetch the union of all plans' ranges once, then fan out to each plan
+    ranges = {
+        plan.id: sync_service.resolve_sync_range(db, plan.id, end_date=today, mode="incremental")[1:]
+        for plan in active_plans
+    }
+    union_start = min(start for start, _ in ranges.values())
+    print(f"\nFetching activities from {union_start} to {today} for all plans")
+    try:
+        activities = await sync_service.fetch_running_activities(union_start, today)
+    except Exception as e:
+        print(f"ERROR: Failed to fetch Garmin activities: {e}")
+        await sync_service.close()
+        sys.exit(1)
 
-    for plan in active_plans:
-        print(f"\nSyncing plan: {plan.race_name} (ID: {plan.id})")
+    async def sync_plan(plan: TrainingPlan):
+        # Each plan gets its own session since they run concurrently
+        plan_db = SessionLocal()
         try:
+            start_date, end_date = ranges[plan.id]
+            print(f"\nSyncing plan: {plan.name} (ID: {plan.id}) from {start_date}")
+            # No explicit start, so each data type resumes from its own cursor
             synced = await sync_service.sync_activities(
-                db=db,
+                db=plan_db,
                 plan_id=plan.id,
-                start_date=start_date,
                 end_date=end_date,
+                activities=activities,
             )
             print(f"Synced {len(synced)} activities for plan {plan.id}")
         except Exception as e:
             print(f"ERROR syncing plan {plan.id}: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            plan_db.close()
+
+    await asyncio.gather(*(sync_plan(plan) for plan in active_plans))
+    await sync_service.close()
+
+
+@contextmanager
+def cron_lock():
+    """Hold an exclusive lock so overlapping cron runs don't sync twice.
+
+    Uses a Postgres advisory lock when available (works across containers),
+    otherwise an flock on a file next to the SQLite database. Yields whether
+    the lock was acquired.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": CRON_LOCK_KEY}).scalar()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": CRON_LOCK_KEY})
+        return
+
+    lock_path = os.path.join(tempfile.gettempdir(), "paris2026_cron_sync.lock")
+    with open(lock_path, "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 async def main():
@@ -118,7 +175,16 @@ async def main():
     db = SessionLocal()
 
     try:
-        await sync_active_plans(db, token_path)
+        with cron_lock() as acquired:
+            if not acquired:
+                print("Another sync is already running, exiting")
+                return
+            await sync_active_plans(db, token_path)
+
+            pruned = prune_change_log(db)
+            db.commit()
+            if pruned:
+                print(f"Pruned {pruned} change log entries")
         print("\nSync completed successfully!")
     except Exception as e:
         print(f"\nERROR during sync: {e}")
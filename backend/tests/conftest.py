@@ -0,0 +1,99 @@
+"""Shared fixtures: a throwaway SQLite database, an API client and seed data."""
+from datetime import date, datetime, timedelta
+import os
+import tempfile
+
+# Point the app at a temporary database before anything imports app.database
+_DB_DIR = tempfile.mkdtemp(prefix="paris2026-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import Base, SessionLocal, async_engine, engine, init_db
+from app.main import app
+from app.models import ActualRun, PlannedWorkout, TrainingPlan
+from app.services.response_cache import response_cache
+from app.services.stats import rebuild_plan_stats
+
+init_db()
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    """Empty every table and the response cache after each test."""
+    yield
+    response_cache.clear()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def query_log():
+    """SQL statements executed by the sync and async engines while the test runs."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [engine, async_engine.sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    yield statements
+    for target in engines:
+        event.remove(target, "before_cursor_execute", record)
+
+
+def seed_plan(db, weeks: int = 12) -> int:
+    """A plan started 30 days ago with a run for every past non-rest day. Returns its ID."""
+    start = date.today() - timedelta(days=30)
+    plan = TrainingPlan(name="Test plan", start_date=start, race_date=start + timedelta(days=7 * weeks))
+    db.add(plan)
+    db.flush()
+    for i in range(7 * weeks):
+        day = start + timedelta(days=i)
+        workout_type = "Rest" if i % 7 == 0 else "Easy Run"
+        workout = PlannedWorkout(
+            plan_id=plan.id,
+            week=i // 7 + 1,
+            day_of_week=day.strftime("%a"),
+            date=day,
+            workout_type=workout_type,
+            target_distance=0 if workout_type == "Rest" else 5,
+        )
+        db.add(workout)
+        db.flush()
+        if day < date.today() and workout_type != "Rest":
+            db.add(ActualRun(
+                planned_workout_id=workout.id,
+                distance=5.1,
+                duration_seconds=3000,
+                pace="9:48/mi",
+                pace_seconds=588,
+                avg_hr=140,
+                hr_zones={"zone1": 100, "zone2": 2000},
+                started_at=datetime.combine(day, datetime.min.time()).replace(hour=7),
+            ))
+    # Like the import scripts, which bypass the API's incremental refresh
+    rebuild_plan_stats(db, plan.id)
+    db.commit()
+    return plan.id
+
+
+@pytest.fixture
+def plan_id(db):
+    return seed_plan(db)
@@ -0,0 +1,63 @@
+"""In-memory stand-in for the garminconnect client."""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+
+class FakeGarmin:
+    """Serves one running activity per day and records every call.
+
+    ``zone_days`` limits which days carry HR zone times (all days if None);
+    dates in ``failing`` raise on sleep/HRV requests; ``details`` maps
+    activity IDs to their activity details (chart metrics).
+    """
+
+    def __init__(
+        self,
+        zone_days: Optional[Set[date]] = None,
+        failing: Optional[Set[date]] = None,
+        details: Optional[Dict[int, Dict[str, Any]]] = None,
+    ):
+        self.zone_days = zone_days
+        self.failing = failing or set()
+        self.details = details or {}
+        self.calls: List[tuple] = []
+
+    def get_activities_by_date(self, start: str, end: str) -> List[Dict[str, Any]]:
+        self.calls.append(("activities", start, end))
+        activities = []
+        day, last = date.fromisoformat(start), date.fromisoformat(end)
+        while day <= last:
+            activity = {
+                "activityId": int(day.strftime("%Y%m%d")),
+                "activityType": {"typeKey": "running"},
+                "startTimeLocal": f"{day.isoformat()} 07:00:00",
+                "distance": 8046.72,
+                "duration": 3000,
+                "averageHR": 145,
+                "maxHR": 170,
+            }
+            if self.zone_days is None or day in self.zone_days:
+                activity.update({f"hrTimeInZone_{n}": 100 * n for n in range(1, 6)})
+            activities.append(activity)
+            day += timedelta(days=1)
+        return activities
+
+    def _daily(self, kind: str, cdate: str, value: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append((kind, cdate))
+        if date.fromisoformat(cdate) in self.failing:
+            raise RuntimeError(f"{kind} unavailable")
+        return value
+
+    def get_sleep_data(self, cdate: str) -> Dict[str, Any]:
+        return self._daily("sleep", cdate, {"dailySleepDTO": {"sleepTimeSeconds": 27000}})
+
+    def get_hrv_data(self, cdate: str) -> Dict[str, Any]:
+        return self._daily("hrv", cdate, {"hrvSummary": {"lastNightAvg": 55}})
+
+    def get_activity_splits(self, activity_id: str) -> Dict[str, Any]:
+        self.calls.append(("splits", activity_id))
+        return {"lapDTOs": []}
+
+    def get_activity_details(self, activity_id: str, maxchart: int = 2000) -> Dict[str, Any]:
+        self.calls.append(("details", activity_id))
+        return self.details.get(int(activity_id), {})
@@ -0,0 +1,15 @@
+"""Database URL handling."""
+import pytest
+
+from app.database import async_database_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:////data/marathon.db", "sqlite+aiosqlite:////data/marathon.db"),
+    ("sqlite+pysqlite:///marathon.db", "sqlite+aiosqlite:///marathon.db"),
+    ("postgresql://user:secret@db:5432/paris", "postgresql+asyncpg://user:secret@db:5432/paris"),
+    ("postgresql+psycopg2://user:secret@db/paris", "postgresql+asyncpg://user:secret@db/paris"),
+    ("postgresql+asyncpg://user:secret@db/paris", "postgresql+asyncpg://user:secret@db/paris"),
+])
+def test_async_database_url_swaps_the_driver(url, expected):
+    assert async_database_url(url) == expected
@@ -0,0 +1,168 @@
+"""Garmin activity ingestion."""
+from datetime import date, timedelta
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.models import ActualRun, PlannedWorkout, RunStream, TrainingPlan
+from app.services.garmin_sync import GarminSyncService
+from app.services.sync_jobs import SyncJob
+from app.services.sync_cursors import get_cursors
+from tests.fake_garmin import FakeGarmin
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr("app.services.garmin_sync.GARMIN_RATE_PER_SECOND", 1000.0)
+
+
+def _sync(db, fake, start, end, plan_id=None, **kwargs):
+    service = GarminSyncService("", "", max_workers=2)
+    service.client = fake
+    if plan_id is None:
+        plan = TrainingPlan(name="Sync plan", start_date=start, race_date=end + timedelta(days=60))
+        db.add(plan)
+        db.commit()
+        plan_id = plan.id
+    try:
+        return asyncio.run(service.sync_activities(db, plan_id, start, end, **kwargs))
+    finally:
+        asyncio.run(service.close())
+
+
+def _zones(db):
+    return {
+        run.started_at.date(): run.hr_zones
+        for run in db.query(ActualRun).order_by(ActualRun.started_at)
+    }
+
+
+def test_activities_with_and_without_hr_zones(db, monkeypatch):
+    monkeypatch.setattr(GarminSyncService, "_runs_needing_weather", lambda self, *args: [])
+    start = date(2026, 1, 5)
+    end = start + timedelta(days=3)
+    # Zone data only on the middle days: first and last activities have none
+    zone_days = {start + timedelta(days=1), start + timedelta(days=2)}
+
+    synced = _sync(db, FakeGarmin(zone_days=zone_days), start, end)
+
+    assert len(synced) == 4
+    zones = _zones(db)
+    assert zones[start] is None
+    assert zones[end] is None
+    for day in zone_days:
+        assert zones[day] == {f"zone{n}": 100 * n for n in range(1, 6)}
+
+
+def _daily_plan(db, start, days):
+    plan = TrainingPlan(name="Cursor plan", start_date=start, race_date=start + timedelta(days=days))
+    db.add(plan)
+    db.flush()
+    for i in range(days):
+        day = start + timedelta(days=i)
+        db.add(PlannedWorkout(
+            plan_id=plan.id,
+            week=i // 7 + 1,
+            day_of_week=day.strftime("%a"),
+            date=day,
+            workout_type="Easy Run",
+            target_distance=5,
+        ))
+    db.commit()
+    return plan.id
+
+
+def test_failed_sleep_day_is_retried_by_later_incremental_sync(db):
+    start = date(2026, 1, 1)
+    plan_id = _daily_plan(db, start, 40)
+    failed_day = date(2026, 1, 8)
+
+    _sync(db, FakeGarmin(failing={failed_day}), start, date(2026, 1, 10), plan_id=plan_id)
+    assert get_cursors(db, plan_id)["sleep"] == failed_day - timedelta(days=1)
+
+    # A later explicit range leaves a gap after the sleep cursor, so it must not move it
+    _sync(db, FakeGarmin(), date(2026, 1, 20), date(2026, 1, 25), plan_id=plan_id)
+    db.expire_all()
+    cursors = get_cursors(db, plan_id)
+    assert cursors["sleep"] == failed_day - timedelta(days=1)
+    assert cursors["activities"] == date(2026, 1, 10)
+
+    fake = FakeGarmin()
+    _sync(db, fake, None, date(2026, 2, 5), plan_id=plan_id)
+    db.expire_all()
+    assert ("sleep", failed_day.isoformat()) in fake.calls
+    assert get_cursors(db, plan_id)["sleep"] == date(2026, 2, 5)
+    workout = db.query(PlannedWorkout).filter(PlannedWorkout.date == failed_day).one()
+    assert workout.sleep_hours == 7.5
+
+
+def test_explicit_range_after_a_gap_creates_no_cursors(db):
+    start = date(2026, 1, 1)
+    plan_id = _daily_plan(db, start, 40)
+
+    _sync(db, FakeGarmin(), date(2026, 1, 20), date(2026, 1, 25), plan_id=plan_id)
+    assert get_cursors(db, plan_id) == {}
+
+    _sync(db, FakeGarmin(), start, date(2026, 1, 10), plan_id=plan_id)
+    db.expire_all()
+    assert get_cursors(db, plan_id) == {
+        "activities": date(2026, 1, 10),
+        "weather": date(2026, 1, 10),
+        "sleep": date(2026, 1, 10),
+        "hrv": date(2026, 1, 10),
+    }
+
+
+def _details(heart_rates):
+    return {
+        "metricDescriptors": [
+            {"key": "sumDuration", "metricsIndex": 0},
+            {"key": "directHeartRate", "metricsIndex": 1},
+        ],
+        "activityDetailMetrics": [{"metrics": [float(t), hr]} for t, hr in enumerate(heart_rates)],
+    }
+
+
+def test_out_of_range_stream_only_skips_its_own_run(db):
+    start = date(2026, 1, 1)
+    end = start + timedelta(days=2)
+    plan_id = _daily_plan(db, start, 10)
+    glitch = start + timedelta(days=1)
+    fake = FakeGarmin(details={
+        int(start.strftime("%Y%m%d")): _details([120, 121, 122]),
+        int(glitch.strftime("%Y%m%d")): _details([120, 65535, 122]),
+        int(end.strftime("%Y%m%d")): _details([130, 131, 132]),
+    })
+    job = SyncJob(plan_id, start, end, "incremental")
+
+    synced = _sync(db, fake, start, end, plan_id=plan_id, progress=job)
+
+    assert len(synced) == 3
+    stored = {db.get(ActualRun, run_id).started_at.date() for (run_id,) in db.query(RunStream.run_id)}
+    assert stored == {start, end}
+    assert job.streams_imported == 2
+    assert any("Skipped stream" in e for e in job.errors)
+    # The rest of the sync still ran
+    assert get_cursors(db, plan_id) == {data_type: end for data_type in ("activities", "weather", "sleep", "hrv")}
+
+
+def test_sync_database_work_runs_off_the_event_loop(db):
+    start = date(2026, 1, 1)
+    plan_id = _daily_plan(db, start, 10)
+    threads = set()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        threads.add(threading.get_ident())
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fake = FakeGarmin(details={int(start.strftime("%Y%m%d")): _details([120, 121])})
+        _sync(db, fake, start, start + timedelta(days=2), plan_id=plan_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # asyncio.run drives the loop on this thread
+    assert threads and threading.get_ident() not in threads
@@ -0,0 +1,59 @@
+"""Query-count regression tests: stats endpoints must not issue a query per week."""
+from sqlalchemy import func, select
+
+import pytest
+
+from app.models import PlanWeekStats, TrainingPlan
+from app.services.response_cache import response_cache
+from app.services.stats import rebuild_plan_stats
+
+from tests.conftest import seed_plan
+
+
+def _queries(client, query_log, path, plan_id):
+    response_cache.clear()
+    query_log.clear()
+    response = client.get(f"/api/stats/{path}?plan_id={plan_id}")
+    assert response.status_code == 200
+    return list(query_log)
+
+
+@pytest.mark.parametrize("path, expected", [("weekly", 1), ("summary", 2)])
+def test_stats_query_count_is_independent_of_plan_length(client, db, query_log, path, expected):
+    short_plan, long_plan = seed_plan(db, weeks=4), seed_plan(db, weeks=30)
+
+    assert len(_queries(client, query_log, path, short_plan)) == expected
+    assert len(_queries(client, query_log, path, long_plan)) == expected
+
+
+def test_stats_without_stored_rollups_are_read_only(client, db, query_log):
+    plan_id = seed_plan(db, weeks=30)
+    expected = client.get(f"/api/stats/weekly?plan_id={plan_id}").json()
+    version = db.scalar(select(TrainingPlan.version).filter(TrainingPlan.id == plan_id))
+    db.query(PlanWeekStats).delete()
+    db.commit()
+
+    statements = _queries(client, query_log, "weekly", plan_id)
+    assert len(statements) == 2
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+    assert _queries(client, query_log, "weekly", plan_id) == statements
+    assert client.get(f"/api/stats/weekly?plan_id={plan_id}").json() == expected
+    db.expire_all()
+    assert db.scalar(select(func.count()).select_from(PlanWeekStats)) == 0
+    assert db.scalar(select(TrainingPlan.version).filter(TrainingPlan.id == plan_id)) == version
+
+
+def test_weekly_rollup_rebuild_is_batched(db, query_log):
+    for weeks in (4, 30):
+        plan_id = seed_plan(db, weeks=weeks)
+        query_log.clear()
+        assert rebuild_plan_stats(db, plan_id) == weeks
+        db.commit()
+        assert sum(s.lstrip().upper().startswith("INSERT") for s in query_log) == 1
+
+
+def test_cached_weekly_stats_issue_no_queries(client, plan_id, query_log):
+    _queries(client, query_log, "weekly", plan_id)
+    query_log.clear()
+    assert client.get(f"/api/stats/weekly?plan_id={plan_id}").status_code == 200
+    assert query_log == []
@@ -0,0 +1,102 @@
+"""EXPLAIN QUERY PLAN checks: the hot stats, workouts and runs queries must use their indexes."""
+from datetime import date, timedelta
+import re
+
+import pytest
+from sqlalchemy import event, inspect, text
+
+from app.database import async_engine, engine
+from app.migrations import _backfill_week_stats, _extend_plan_week_index
+from app.models import ActualRun, PlanWeekStats
+from app.services.stats import refresh_week_stats
+
+
+@pytest.fixture
+def executed():
+    """(statement, parameters) for every SELECT run by either engine during the test."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engines = [engine, async_engine.sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    yield statements
+    for target in engines:
+        event.remove(target, "before_cursor_execute", record)
+
+
+def _query_plan(statements):
+    """The EXPLAIN QUERY PLAN detail lines of every recorded statement."""
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        return [
+            row[-1]
+            for statement, parameters in statements
+            for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        ]
+    finally:
+        connection.close()
+
+
+def _assert_uses_index(statements, index):
+    plan = _query_plan(statements)
+    assert any(re.search(rf"USING (COVERING )?INDEX {index}\b", line) for line in plan), plan
+
+
+def _get(client, executed, url):
+    executed.clear()
+    assert client.get(url).status_code == 200
+    return list(executed)
+
+
+def test_workouts_by_date_range_use_plan_date_index(client, executed, plan_id):
+    start, end = date.today() - timedelta(days=7), date.today() + timedelta(days=7)
+    statements = _get(client, executed, f"/api/workouts/?plan_id={plan_id}&start_date={start}&end_date={end}")
+    _assert_uses_index(statements, "ix_planned_workouts_plan_date")
+
+
+def test_week_workouts_use_plan_week_index(client, executed, plan_id):
+    statements = _get(client, executed, f"/api/workouts/week/2?plan_id={plan_id}")
+    _assert_uses_index(statements, "ix_planned_workouts_plan_week")
+
+
+def test_week_rollup_refresh_uses_plan_week_index(db, executed, plan_id):
+    refresh_week_stats(db, plan_id, [2, 3])
+    _assert_uses_index(executed, "ix_planned_workouts_plan_week")
+
+
+@pytest.mark.parametrize("query", ["", f"?start_date={date.today() - timedelta(days=14)}"])
+def test_run_listing_uses_started_at_index(client, executed, plan_id, query):
+    statements = _get(client, executed, f"/api/runs/{query}")
+    _assert_uses_index(statements, "ix_actual_runs_started_at_id")
+
+
+def test_run_splits_use_run_split_index(client, db, executed, plan_id):
+    run_id = db.query(ActualRun.id).first()[0]
+    split = {"distance": 1.0, "duration_seconds": 588, "pace": "9:48/mi", "pace_seconds": 588}
+    client.put(f"/api/runs/{run_id}/splits", json=[{"split_number": n, **split} for n in (1, 2)])
+
+    statements = _get(client, executed, f"/api/runs/{run_id}")
+    _assert_uses_index([s for s in statements if "FROM run_splits" in s[0]], "ix_run_splits_run_split")
+
+
+def test_migration_extends_an_existing_plan_week_index():
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_planned_workouts_plan_week"))
+        conn.execute(text("CREATE INDEX ix_planned_workouts_plan_week ON planned_workouts (plan_id, week)"))
+        _extend_plan_week_index(conn)
+        _extend_plan_week_index(conn)
+        indexes = {ix["name"]: ix["column_names"] for ix in inspect(conn).get_indexes("planned_workouts")}
+    assert indexes["ix_planned_workouts_plan_week"] == ["plan_id", "week", "date"]
+
+
+def test_migration_backfills_missing_week_stats(db, plan_id):
+    db.query(PlanWeekStats).delete()
+    db.commit()
+    with engine.begin() as conn:
+        _backfill_week_stats(conn)
+    assert db.query(PlanWeekStats).filter(PlanWeekStats.plan_id == plan_id).count() == 12
@@ -0,0 +1,34 @@
+"""Response cache backends."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.response_cache import CacheBackend, MemoryCacheBackend, plan_tag
+
+
+def test_backend_must_implement_every_method():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_memory_backend_survives_concurrent_writes_and_invalidations():
+    backend = MemoryCacheBackend(max_entries=64, ttl=60)
+
+    def work(worker):
+        for i in range(2000):
+            plan_id = i % 8
+            backend.set(f"{worker}:{i}", b"{}", [plan_tag(plan_id)])
+            backend.get(f"{worker}:{i - 1}")
+            if i % 5 == 0:
+                backend.invalidate([plan_tag(plan_id)])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+
+    assert len(backend) <= 64
+    tagged = set().union(*backend._keys_by_tag.values()) if backend._keys_by_tag else set()
+    assert tagged == set(backend._entries)
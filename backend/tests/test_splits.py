@@ -0,0 +1,38 @@
+"""Conversion of Garmin laps into mile splits."""
+import pytest
+
+from app.services.splits import METERS_PER_MILE, laps_to_mile_splits
+
+
+def _lap(miles, seconds, hr=None):
+    return {"distance": miles * METERS_PER_MILE, "duration": seconds, "averageHR": hr}
+
+
+def test_laps_crossing_mile_boundaries_are_divided_by_distance():
+    # 1.5 mi at 8:00/mi, then 1.5 mi at 10:00/mi
+    splits = laps_to_mile_splits([_lap(1.5, 720, hr=150), _lap(1.5, 900, hr=160)])
+
+    assert [s["distance"] for s in splits] == [1.0, 1.0, 1.0]
+    assert [s["duration_seconds"] for s in splits] == [480, 540, 600]
+    assert splits[1]["pace"] == "9:00/mi"
+    assert splits[1]["avg_hr"] == round((150 * 240 + 160 * 300) / 540)
+
+
+def test_zero_distance_lap_time_counts_towards_the_current_split():
+    laps = [_lap(0.5, 240), {"distance": 0, "duration": 120}, _lap(1.0, 480)]
+    splits = laps_to_mile_splits(laps)
+
+    assert sum(s["duration_seconds"] for s in splits) == 840
+    assert splits[0]["duration_seconds"] == 240 + 120 + 240
+    assert splits[0]["pace_seconds"] == 600
+    assert splits[1]["duration_seconds"] == 240
+
+
+@pytest.mark.parametrize("tail", [{"distance": 0, "duration": 90}, _lap(0.01, 90)])
+def test_trailing_time_too_short_for_a_split_joins_the_last_one(tail):
+    splits = laps_to_mile_splits([_lap(2.0, 960), tail])
+
+    assert len(splits) == 2
+    assert sum(s["duration_seconds"] for s in splits) == 1050
+    assert splits[-1]["split_number"] == 2
+    assert splits[-1]["duration_seconds"] == 570
@@ -0,0 +1,50 @@
+"""Run stream storage and API."""
+import math
+
+import pytest
+
+from app.models import ActualRun
+from app.services.streams import InvalidStream, build_stream
+
+
+@pytest.fixture
+def run_id(db):
+    run = ActualRun(distance=5.0, duration_seconds=3000, pace="10:00/mi", pace_seconds=600)
+    db.add(run)
+    db.commit()
+    return run.id
+
+
+def test_stream_round_trip(client, run_id):
+    upload = {
+        "t": [0, 1, 2, 700, 701],
+        "hr": [120, None, 122, 150, 151],
+        "elevation": [10.5, 10.6, None, 11, 11.2],
+        "lat": [48.8566101, 48.8566202, 48.8566303, 48.86, 48.8600001],
+    }
+    response = client.put(f"/api/runs/{run_id}/stream", json=upload)
+    assert response.status_code == 200
+    assert response.json()["chunks"] == 2
+
+    stream = client.get(f"/api/runs/{run_id}/stream").json()
+    assert stream["t"] == upload["t"]
+    assert stream["hr"] == upload["hr"]
+    assert stream["elevation"] == [10.5, 10.6, None, 11.0, 11.2]
+    assert stream["lat"] == [round(v, 6) for v in upload["lat"]]
+
+    ranged = client.get(f"/api/runs/{run_id}/stream?start=700&end=800").json()
+    assert ranged["t"] == [700, 701]
+
+
+@pytest.mark.parametrize("channel, value", [("lat", 1e13), ("hr", -5000), ("t", 1e12)])
+def test_out_of_range_values_are_rejected(client, run_id, channel, value):
+    upload = {"t": [0, 1], channel: [value, value] if channel != "t" else [0, value]}
+    response = client.put(f"/api/runs/{run_id}/stream", json=upload)
+    assert response.status_code == 400
+    assert client.get(f"/api/runs/{run_id}/stream").status_code == 404
+
+
+@pytest.mark.parametrize("value", [math.inf, -math.inf])
+def test_non_finite_values_are_rejected(value):
+    with pytest.raises(InvalidStream):
+        build_stream(1, {"t": [0, 1], "elevation": [1.0, value]})
@@ -0,0 +1,69 @@
+"""Background sync jobs."""
+import asyncio
+
+from app.services.sync_jobs import SyncJob, SyncJobManager, sync_jobs
+
+
+class BlockingService:
+    """Stands in for GarminSyncService; each sync runs until ``release`` is set."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def sync_activities(self, db, plan_id, start_date, end_date, progress, mode):
+        self.calls += 1
+        await self.release.wait()
+        return []
+
+
+def test_running_job_is_reused_whatever_the_mode():
+    async def scenario():
+        manager, service = SyncJobManager(), BlockingService()
+        first, created = manager.enqueue(service, 1, mode="incremental")
+        second, reused_created = manager.enqueue(service, 1, mode="full")
+        other_plan, other_created = manager.enqueue(service, 2, mode="full")
+        await asyncio.sleep(0)
+        service.release.set()
+        await asyncio.gather(*manager._tasks.values())
+        return first, created, second, reused_created, other_plan, other_created, service.calls
+
+    first, created, second, reused_created, other_plan, other_created, calls = asyncio.run(scenario())
+    assert created and not reused_created and other_created
+    assert second is first and other_plan is not first
+    assert calls == 2
+
+
+def test_every_listener_sees_each_change():
+    async def scenario():
+        manager, service = SyncJobManager(), BlockingService()
+        job, _ = manager.enqueue(service, 1)
+        await asyncio.sleep(0)  # let the job start
+        seen = job.version
+        listeners = [asyncio.create_task(job.wait_for_change(seen, timeout=5)) for _ in range(3)]
+        await asyncio.sleep(0)
+        job.update(activities_fetched=1)
+        versions = await asyncio.wait_for(asyncio.gather(*listeners), timeout=1)
+
+        # A change made before the next wait is returned at once rather than missed
+        job.update(activities_fetched=1)
+        late = await asyncio.wait_for(job.wait_for_change(versions[0], timeout=5), timeout=1)
+
+        service.release.set()
+        await asyncio.gather(*manager._tasks.values())
+        return seen, versions, late
+
+    seen, versions, late = asyncio.run(scenario())
+    assert all(v > seen for v in versions)
+    assert late > versions[0]
+
+
+def test_login_and_logout_refuse_while_a_job_runs(client):
+    job = SyncJob(1, None, None, "incremental")
+    job.status = "running"
+    sync_jobs.jobs[job.id] = job
+    try:
+        assert client.post("/api/sync/garmin/logout").status_code == 409
+        assert client.post("/api/sync/garmin/login?email=a&password=b").status_code == 409
+    finally:
+        del sync_jobs.jobs[job.id]
@@ -0,0 +1,38 @@
+"""Training load series."""
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from app.models import TrainingLoadDay
+from app.services.training_load import refresh_training_load
+
+
+def _series(client, start):
+    response = client.get(f"/api/stats/training-load?start={start.isoformat()}")
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_get_computes_unstored_days_without_writing(client, db, plan_id):
+    start = date.today() - timedelta(days=20)
+    in_memory = _series(client, start)
+    assert db.scalar(select(func.count()).select_from(TrainingLoadDay)) == 0
+    assert in_memory[-1]["date"] == date.today().isoformat()
+
+    refresh_training_load(db)
+    db.commit()
+    assert _series(client, start) == in_memory
+
+
+def test_get_extends_a_stale_series_in_memory(client, db, plan_id):
+    refresh_training_load(db)
+    db.commit()
+    expected = _series(client, date.today() - timedelta(days=20))
+
+    # Drop the last few days, as if they passed without a refresh
+    stale_from = date.today() - timedelta(days=3)
+    db.query(TrainingLoadDay).filter(TrainingLoadDay.day >= stale_from).delete()
+    db.commit()
+
+    assert _series(client, date.today() - timedelta(days=20)) == expected
+    assert db.scalar(select(func.max(TrainingLoadDay.day))) == stale_from - timedelta(days=1)
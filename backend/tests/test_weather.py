@@ -0,0 +1,33 @@
+"""Weather batch fetching."""
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from app.models import WeatherCache
+from app.services.weather import WeatherService
+
+
+def _archive(request):
+    lat = float(request.url.params["latitude"])
+    if lat < 20:
+        return httpx.Response(200, content=b"<html>upstream error</html>")
+    if lat < 30:
+        return httpx.Response(200, json={"hourly": ["not", "a", "dict"]})
+    day = request.url.params["start_date"]
+    return httpx.Response(200, json={"hourly": {
+        "time": [f"{day}T{h:02d}:00" for h in range(24)],
+        "temperature_2m": [50.0 + h for h in range(24)],
+    }})
+
+
+def test_bad_payloads_only_lose_their_own_range(db):
+    service = WeatherService(httpx.AsyncClient(transport=httpx.MockTransport(_archive)))
+    when = datetime(2026, 3, 1, 7)
+    points = [(10.0, 2.0, when), (25.0, 2.0, when), (48.85, 2.35, when)]
+
+    results = asyncio.run(service.get_historical_weather_batch(points, db))
+
+    assert results[0] is None and results[1] is None
+    assert results[2]["temperature"] == 57.0
+    assert [row.lat_cell for row in db.query(WeatherCache)] == [4885]
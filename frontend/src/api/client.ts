@@ -88,6 +88,33 @@ export interface RunNote {
   updated_at: string
 }
 
+export interface SyncJob {
+  job_id: string
+  plan_id: number
+  status: 'queued' | 'running' | 'succeeded' | 'failed'
+  activities_fetched: number
+  activities_matched: number
+  activities_synced: number
+  weather_enriched: number
+  splits_imported: number
+  streams_imported: number
+  errors: string[]
+}
+
+export interface Change {
+  entity: 'plans' | 'workouts' | 'runs' | 'notes' | 'splits' | 'weather'
+  id: number
+  seq: number
+  op: 'upsert' | 'delete'
+  data?: Record<string, unknown>
+}
+
+export interface ChangePage {
+  cursor: number
+  has_more: boolean
+  changes: Change[]
+}
+
 export interface Countdown {
   race_date: string
   race_name: string
@@ -98,6 +125,56 @@ export interface Countdown {
   target_time: string | null
 }
 
+export interface Dashboard {
+  plan_id: number
+  summary: {
+    plan_name: string
+    race_date: string
+    days_until_race: number
+    current_week: number
+    total_workouts: number
+    run_workouts: number
+    completed_runs: number
+    completion_rate: number
+    total_planned_miles: number
+    total_actual_miles: number
+    miles_remaining: number
+  }
+  weekly: Array<{ week: number; planned_miles: number; actual_miles: number; total_runs: number; completed_runs: number }>
+  countdown: Countdown
+  hr_zones: Record<'zone1' | 'zone2' | 'zone3' | 'zone4' | 'zone5', number>
+  today: Workout | null
+}
+
+export interface TrainingLoadDay {
+  date: string
+  load: number
+  atl: number
+  ctl: number
+  tsb: number
+}
+
+// Keys are miles_Nd, seconds_Nd and runs_Nd for each requested window N
+export interface RollingDay {
+  date: string
+  [key: string]: string | number
+}
+
+// Columnar samples; channels missing from the run are omitted
+export interface RunStream {
+  run_id: number
+  sample_count: number
+  duration_seconds: number
+  points: number
+  t: number[]
+  hr?: (number | null)[]
+  pace?: (number | null)[]
+  cadence?: (number | null)[]
+  elevation?: (number | null)[]
+  lat?: (number | null)[]
+  lon?: (number | null)[]
+}
+
 // API functions
 export const getWorkouts = (params?: { plan_id?: number; week?: number }) =>
   api.get<Workout[]>('/workouts/', { params })
@@ -109,9 +186,25 @@ export const upsertNote = (workoutId: number, data: Partial<RunNote>) =>
 
 export const getCountdown = (planId: number) =>
   api.get<Countdown>('/stats/countdown', { params: { plan_id: planId } })
+export const getDashboard = (planId: number) =>
+  api.get<Dashboard>('/dashboard/', { params: { plan_id: planId } })
+export const replaceRunSplits = (runId: number, splits: Omit<RunSplit, 'id'>[]) =>
+  api.put<RunSplit[]>(`/runs/${runId}/splits`, splits)
+export const getRunStream = (runId: number, params?: { start?: number; end?: number; max_points?: number }) =>
+  api.get<RunStream>(`/runs/${runId}/stream`, { params })
+export const getTrainingLoad = (start?: string, end?: string) =>
+  api.get<TrainingLoadDay[]>('/stats/training-load', { params: { start, end } })
+export const getRollingStats = (windows: number[] = [7, 28], start?: string, end?: string) =>
+  api.get<RollingDay[]>('/stats/rolling', { params: { windows, start, end }, paramsSerializer: { indexes: null } })
 
 export const garminStatus = () => api.get('/sync/garmin/status')
 export const garminSync = (planId: number, startDate?: string, endDate?: string) =>
-  api.post('/sync/garmin/activities', null, { params: { plan_id: planId, start_date: startDate, end_date: endDate } })
+  api.post<SyncJob>('/sync/garmin/activities', null, { params: { plan_id: planId, start_date: startDate, end_date: endDate } })
+export const getSyncJob = (jobId: string) =>
+  api.get<SyncJob>(`/sync/jobs/${jobId}`)
+
+// Omit `since` to get the current cursor; a 410 means the cursor expired and data must be reloaded
+export const getChanges = (since?: number, limit?: number) =>
+  api.get<ChangePage>('/changes/', { params: { since, limit } })
 
 export default api
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react'
-import { getWorkouts, getCountdown, garminStatus, garminSync, updateWorkout, upsertNote, type Workout, type Countdown } from '../api/client'
+import { getWorkouts, getCountdown, garminStatus, garminSync, getSyncJob, updateWorkout, upsertNote, type Workout, type Countdown } from '../api/client'
 
 function formatDuration(seconds: number): string {
   const hrs = Math.floor(seconds / 3600)
@@ -70,8 +70,17 @@ export default function Plan() {
     setSyncing(true)
     setSyncMessage('')
     try {
-      const res = await garminSync(planId)
-      const count = res.data.activities_synced
+      // Sync runs in the background; poll the job until it finishes
+      let job = (await garminSync(planId)).data
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        job = (await getSyncJob(job.job_id)).data
+      }
+      if (job.status === 'failed') {
+        setSyncMessage('Failed')
+        return
+      }
+      const count = job.activities_synced
       setSyncMessage(count > 0 ? `${count} synced` : 'Up to date')
       await loadData()
     } catch {
@@ -45,6 +45,10 @@ def export_model(db: Session, model_class, name: str) -> list:
         for column in record.__table__.columns:
             value = getattr(record, column.name)
             record_dict[column.name] = serialize_value(value)
+        if isinstance(record, ActualRun):
+            # Stored compressed in a separate table
+            record_dict["raw_data"] = record.raw_data
+            record_dict["hr_zones"] = record.hr_zones
         data.append(record_dict)
 
     print(f"Exported {len(data)} {name} records")
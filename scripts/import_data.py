@@ -21,6 +21,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.database import engine, SessionLocal, SQLALCHEMY_DATABASE_URL
 from app.models import TrainingPlan, PlannedWorkout, ActualRun, RunSplit, RunWeather, RunNote
+from app.services.stats import rebuild_plan_stats
+from app.services.training_load import refresh_training_load
 
 
 def parse_date(value):
@@ -240,6 +242,12 @@ def main():
         # Reset sequences for PostgreSQL
         reset_sequences(db)
 
+        # Imported rows bypass the API, so rebuild the weekly rollups
+        rebuild_plan_stats(db)
+        refresh_training_load(db)
+        db.commit()
+        print("Rebuilt weekly stats and training load")
+
         print("\nImport completed successfully!")
 
     except Exception as e:
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
 
 from app.database import SessionLocal, init_db
 from app.models import TrainingPlan, PlannedWorkout, ActualRun, RunNote
+from app.services.stats import rebuild_plan_stats
 
 
 def parse_pace_to_seconds(pace_str: str) -> int:
@@ -110,6 +111,10 @@ def import_plan(json_path: str):
                     db.commit()
                     note_count += 1
 
+        # Workouts added here bypass the API, so build the weekly rollups
+        rebuild_plan_stats(db, plan.id)
+        db.commit()
+
         print(f"Imported {workout_count} workouts")
         print(f"Imported {run_count} actual runs")
         print(f"Imported {note_count} notes")
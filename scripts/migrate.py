@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Create missing tables and apply pending schema migrations.
+The app does this on startup; run it to migrate ahead of a deploy.
+
+Usage:
+    python scripts/migrate.py
+"""
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.database import engine, init_db
+from app.migrations import current_version
+
+
+def main():
+    """Apply migrations and report the schema version."""
+    init_db()
+    with engine.connect() as conn:
+        print(f"Schema version: {current_version(conn)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Rebuild the materialized weekly stats and training load tables from planned
+workouts and runs.
+Use to repair rollups after manual database edits or bulk imports.
+
+Usage:
+    python scripts/rebuild_stats.py            # all plans
+    python scripts/rebuild_stats.py <plan_id>  # a single plan
+"""
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.database import SessionLocal, init_db
+from app.services.stats import rebuild_plan_stats
+from app.services.training_load import refresh_training_load
+
+
+def main():
+    """Rebuild weekly stats rollups."""
+    plan_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    init_db()
+    db = SessionLocal()
+
+    try:
+        written = rebuild_plan_stats(db, plan_id)
+        db.commit()
+        target = f"plan {plan_id}" if plan_id is not None else "all plans"
+        print(f"Rebuilt {written} weekly stats rows for {target}")
+
+        # Training load spans all plans, so it is always rebuilt in full
+        days = refresh_training_load(db)
+        db.commit()
+        print(f"Rebuilt {days} training load days")
+    except Exception as e:
+        db.rollback()
+        print(f"ERROR: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()